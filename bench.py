@@ -0,0 +1,370 @@
+"""Benchmark harness for the festival API.
+
+Seeds a synthetic festival (users, artworks, votes) through the models in
+learn.py, drives the hot endpoints and prints p50/p99 latency, throughput
+and SQL statements per request as JSON, so runs can be compared across
+commits:
+
+    python bench.py --users 50000 --artworks 100000 --votes 5000000 --output before.json
+
+By default requests go through the Flask test client against a SQLite
+database in --workdir. Pass --url to drive a running server instead (seed it
+first by running with the same DATABASE_URL as the server); query counts are
+only available in test-client mode.
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BENCH_PASSWORD = 'bench-password'
+SEED_CHUNK = 20_000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--artworks', type=int, default=5000)
+    parser.add_argument('--votes', type=int, default=100_000)
+    parser.add_argument('--pending', type=float, default=0.1, help='fraction of artworks awaiting approval')
+    parser.add_argument('--voters', type=int, default=5, help='accounts casting votes and uploading during the run')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=2026)
+    parser.add_argument('--workdir', default=os.path.join(HERE, 'bench-data'),
+                        help='database (unless DATABASE_URL is set) and uploads live here')
+    parser.add_argument('--url', help='benchmark a running server, e.g. http://127.0.0.1:5000')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache (test client only)')
+    parser.add_argument('--scenarios', help='comma-separated subset of scenarios to run')
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    return parser.parse_args()
+
+def load_app(args):
+    """Import learn.py with its database and uploads pointed at the work directory."""
+    os.makedirs(args.workdir, exist_ok=True)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(os.path.abspath(args.workdir), 'bench.db'))
+    os.chdir(args.workdir)
+    sys.path.insert(0, HERE)
+    import learn
+    config = {'PASSWORD_HASH_WORKERS': 0}
+    if args.no_cache:
+        config['RESPONSE_CACHE_TTL'] = 0
+    return learn, learn.create_app(config)
+
+# Seeding
+def seed(learn, app, args):
+    """Fill an empty database; an already seeded one is reused as is."""
+    db = learn.db
+    learn.create_tables()
+    if db.session.query(learn.Artwork.id).first() is not None:
+        return False
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    password_hash = learn.generate_password_hash(BENCH_PASSWORD, app.config['PASSWORD_HASH_METHOD'])
+    category_ids = [row.id for row in db.session.query(learn.Category.id)]
+
+    def insert(model, rows):
+        for start in range(0, len(rows), SEED_CHUNK):
+            db.session.execute(db.insert(model), rows[start:start + SEED_CHUNK])
+        db.session.commit()
+
+    users = [{'username': f'user{i}', 'email': f'user{i}@bench.invalid', 'password_hash': password_hash,
+              'created_at': now - timedelta(days=30)} for i in range(args.users)]
+    users += [{'username': f'voter{i}', 'email': f'voter{i}@bench.invalid', 'password_hash': password_hash,
+               'created_at': now} for i in range(args.voters)]
+    insert(learn.User, users)
+    user_ids = [row.id for row in db.session.query(learn.User.id).filter(learn.User.username.like('user%'))]
+
+    artworks = []
+    for i in range(args.artworks):
+        approved = rng.random() >= args.pending
+        artworks.append({
+            'title': f'Artwork {i} {rng.choice(["sunrise", "icon", "harbour", "portrait", "study"])}',
+            'description': f'Synthetic artwork number {i}',
+            'filename': f'bench-{i}.png',
+            'file_path': f'bench-{i}.png',
+            'artist_id': rng.choice(user_ids),
+            'category_id': rng.choice(category_ids),
+            'is_approved': approved,
+            'is_featured': approved and rng.random() < 0.02,
+            'created_at': now - timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+        })
+    insert(learn.Artwork, artworks)
+    approved_ids = [row.id for row in db.session.query(learn.Artwork.id).filter_by(is_approved=True)]
+
+    # Popularity is skewed: a few artworks collect most of the votes
+    per_user = args.votes // max(len(user_ids), 1)
+    if per_user > len(approved_ids) // 2:
+        raise SystemExit('Too many votes for the number of approved artworks')
+    votes = []
+    for index, user_id in enumerate(user_ids):
+        wanted = per_user + (1 if index < args.votes % len(user_ids) else 0)
+        chosen = set()
+        while len(chosen) < wanted:
+            chosen.add(approved_ids[int(len(approved_ids) * rng.random() ** 3)])
+        votes.extend({'user_id': user_id, 'artwork_id': artwork_id, 'created_at': now} for artwork_id in chosen)
+        if len(votes) >= SEED_CHUNK:
+            insert(learn.Vote, votes)
+            votes = []
+    insert(learn.Vote, votes)
+
+    learn.recount_artworks()
+    if learn.has_search_index():
+        learn.rebuild_search_index()
+    learn.bump_table_versions(*learn.VERSIONED_TABLES)
+    db.session.commit()
+    return True
+
+# Drivers
+class TestClientDriver:
+    """In-process requests; counts the SQL statements each request issues."""
+
+    def __init__(self, learn, app):
+        self.app = app
+        self.local = threading.local()
+        with self.app.app_context():
+            event.listen(learn.db.engine, 'before_cursor_execute', self._count_query)
+
+    def _count_query(self, *args):
+        self.local.queries = getattr(self.local, 'queries', 0) + 1
+
+    def client(self, user_id=None):
+        client = self.app.test_client()
+        if user_id is not None:
+            with client.session_transaction() as session:
+                session['user_id'] = user_id
+        return client
+
+    def request(self, client, method, path, **kwargs):
+        self.local.queries = 0
+        response = client.open(path, method=method, **kwargs)
+        response.close()
+        return response.status_code, response.headers.get('X-Cache'), self.local.queries
+
+class HTTPDriver:
+    """Requests against a running server over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def client(self, user_id=None, username=None):
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        if username is not None:
+            status, _, _ = self.request(opener, 'POST', '/api/auth/login',
+                                        json_body={'username': username, 'password': BENCH_PASSWORD})
+            if status != 200:
+                raise SystemExit(f'Could not log in as {username}: HTTP {status}')
+        return opener
+
+    def request(self, opener, method, path, json_body=None, data=None, content_type=None):
+        headers = {}
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif data is not None:
+            body, headers['Content-Type'] = data, content_type
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with opener.open(req) as response:
+                response.read()
+                return response.status, response.headers.get('X-Cache'), None
+        except urllib.error.HTTPError as error:
+            return error.code, None, None
+
+def png_bytes(rng):
+    from PIL import Image
+    image = Image.frombytes('RGB', (64, 64), rng.randbytes(64 * 64 * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def multipart(fields, file_field, filename, content):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f'Content-Type: image/png\r\n\r\n'.encode() + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+# Scenarios
+def build_scenarios(learn, app, driver, args, rng):
+    """Each scenario is a list of zero-argument callables, one per request."""
+    with app.app_context():
+        db = learn.db
+        approved_ids = [row.id for row in db.session.query(learn.Artwork.id).filter_by(is_approved=True)]
+        voters = db.session.query(learn.User.id, learn.User.username).filter(learn.User.username.like('voter%')).all()
+        category_ids = [row.id for row in db.session.query(learn.Category.id)]
+        # Votes left behind by earlier runs against the same database
+        voted = set(db.session.query(learn.Vote.user_id, learn.Vote.artwork_id)
+                    .filter(learn.Vote.user_id.in_([voter.id for voter in voters])).all())
+    pages = max(len(approved_ids) // 20, 1)
+
+    if isinstance(driver, TestClientDriver):
+        voter_clients = [driver.client(user_id=voter.id) for voter in voters]
+    else:
+        voter_clients = [driver.client(username=voter.username) for voter in voters]
+    if not voter_clients:
+        raise SystemExit('No voter accounts; reseed with --voters > 0')
+
+    def get(path):
+        client = driver.client()
+        return lambda: driver.request(client, 'GET', path)
+
+    scenarios = {}
+    for sort_by in learn.ARTWORK_SORTS:
+        # Most visitors stay near the first pages
+        scenarios[f'artworks_{sort_by}'] = [
+            get(f'/api/artworks?sort={sort_by}&page={min(int(rng.paretovariate(1.5)), pages)}')
+            for _ in range(args.requests)
+        ]
+        scenarios[f'artworks_{sort_by}_category'] = [
+            get(f'/api/artworks?sort={sort_by}&category_id={rng.choice(category_ids)}') for _ in range(args.requests)
+        ]
+    scenarios['top_voted'] = [get('/api/top-voted') for _ in range(args.requests)]
+    scenarios['statistics'] = [get('/api/statistics') for _ in range(args.requests)]
+    # Whole words plus the two-letter prefixes typed while a visitor is still searching
+    search_queries = ['sunrise', 'harbour+portrait', 'su', 'ha', 'ar', 'artwork+st', 'synthetic']
+    scenarios['search'] = [
+        get(f'/api/artworks/search?q={rng.choice(search_queries)}&page={min(int(rng.paretovariate(1.5)), 5)}')
+        for _ in range(args.requests)
+    ]
+
+    # Only artworks the voter has not voted for yet, so no request is a duplicate vote
+    vote_targets = []
+    candidates = rng.sample(approved_ids, len(approved_ids))
+    for index in range(args.requests):
+        voter = voters[index % len(voters)]
+        while candidates and (voter.id, candidates[-1]) in voted:
+            candidates.pop()
+        if not candidates:
+            break
+        vote_targets.append((voter_clients[index % len(voters)], candidates.pop()))
+    scenarios['vote_artwork'] = [
+        (lambda client, artwork_id: lambda: driver.request(client, 'POST', f'/api/artworks/{artwork_id}/vote'))(
+            client, artwork_id)
+        for client, artwork_id in vote_targets
+    ]
+
+    def upload(client, content):
+        fields = {'title': 'Benchmark upload', 'description': 'bench', 'category_id': str(category_ids[0])}
+        if isinstance(driver, TestClientDriver):
+            data = {**fields, 'file': (io.BytesIO(content), 'bench.png')}
+            return lambda: driver.request(client, 'POST', '/api/artworks', data=data,
+                                          content_type='multipart/form-data')
+        body, content_type = multipart(fields, 'file', 'bench.png', content)
+        return lambda: driver.request(client, 'POST', '/api/artworks', data=body, content_type=content_type)
+
+    scenarios['upload_artwork'] = [upload(voter_clients[i % len(voter_clients)], png_bytes(rng))
+                                   for i in range(max(args.requests // 10, 1))]
+
+    if args.scenarios:
+        wanted = args.scenarios.split(',')
+        unknown = set(wanted) - set(scenarios)
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = {name: scenarios[name] for name in wanted}
+    return scenarios
+
+def percentile(values, pct):
+    return values[max(math.ceil(pct / 100 * len(values)) - 1, 0)]
+
+def run_scenario(calls, concurrency):
+    def timed(call):
+        started = time.perf_counter()
+        status, cache, queries = call()
+        return time.perf_counter() - started, status, cache, queries
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, calls))
+    else:
+        results = [timed(call) for call in calls]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(result[0] for result in results)
+    queries = [result[3] for result in results if result[3] is not None]
+    return {
+        'requests': len(results),
+        'errors': sum(1 for result in results if result[1] >= 400),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3),
+        'throughput_rps': round(len(results) / elapsed, 1),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        'max_queries': max(queries) if queries else None,
+        'cache_hits': sum(1 for result in results if result[2] == 'HIT'),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    learn, app = load_app(args)
+
+    with app.app_context():
+        started = time.perf_counter()
+        seeded = seed(learn, app, args)
+        seed_seconds = time.perf_counter() - started
+        dataset = {
+            'users': learn.db.session.query(learn.User).count(),
+            'artworks': learn.db.session.query(learn.Artwork).count(),
+            'votes': learn.db.session.query(learn.Vote).count(),
+        }
+        database = learn.db.engine.dialect.name
+
+    driver = HTTPDriver(args.url) if args.url else TestClientDriver(learn, app)
+    scenarios = build_scenarios(learn, app, driver, args, rng)
+    results = {}
+    for name, calls in scenarios.items():
+        print(f'running {name} ({len(calls)} requests)', file=sys.stderr)
+        results[name] = run_scenario(calls, args.concurrency)
+
+    with app.app_context():
+        learn.get_upload_executor().shutdown(wait=True)
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'database': database,
+        'driver': 'http' if args.url else 'test_client',
+        'concurrency': args.concurrency,
+        'response_cache': not args.no_cache,
+        'dataset': {**dataset, 'seeded_now': seeded, 'seed_seconds': round(seed_seconds, 1) if seeded else None},
+        'scenarios': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
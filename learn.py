@@ -1,34 +1,178 @@
-from flask import Flask, request, jsonify, session, render_template, send_from_directory
+from flask import Blueprint, Flask, Response, request, jsonify, session, render_template, send_from_directory, g
+from flask import current_app, has_app_context, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from flask_cors import CORS
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import OperationalError
+from werkzeug.security import generate_password_hash, check_password_hash, safe_join
 from werkzeug.utils import secure_filename
 from datetime import datetime, date
+import atexit
+import click
+import base64
+import bisect
+import cProfile
+import hashlib
+import json
+import math
+import multiprocessing
 import os
+import queue
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
 import uuid
+import weakref
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from functools import wraps
 
-# Ensure Flask serves the local `static` and `templates` directories inside this project
-app = Flask(__name__, static_folder='static', template_folder='templates')
-app.config['SECRET_KEY'] = 'your-secret-key-change-this'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///festival_art.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.path.join('static', 'uploads')
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # renditions are skipped and originals served instead
+    Image = None
 
-db = SQLAlchemy(app)
-CORS(app, supports_credentials=True)
+def configure_defaults(app):
+    """Default settings; create_app() layers the environment and explicit overrides on top."""
+    app.config['SECRET_KEY'] = 'your-secret-key-change-this'
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///festival_art.db'  # overridden by DATABASE_URL
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = os.path.join('static', 'uploads')
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size (and chunk size)
+    app.config['CHUNKED_UPLOAD_MAX_SIZE'] = 256 * 1024 * 1024  # total size via /api/uploads/chunked
+    app.config['CHUNKED_UPLOAD_EXPIRY_SECONDS'] = 24 * 60 * 60  # abandoned chunked uploads are deleted after this long idle
+    app.config['CHUNKED_UPLOADS_PER_USER'] = 5  # chunked uploads a user may have open at once
+    app.config['LEADERBOARD_REFRESH_SECONDS'] = 30  # resync with votes cast by other workers
+    app.config['RESPONSE_CACHE_SIZE'] = 1024  # cached public GET responses per worker
+    app.config['RESPONSE_CACHE_TTL'] = 10  # seconds; bounds staleness across workers
+    app.config['PRINCIPAL_CACHE_SIZE'] = 10_000  # cached user id/role lookups per worker
+    app.config['PRINCIPAL_CACHE_TTL'] = 10  # seconds; bounds how long other workers honour a revoked role
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt:32768:8:1'  # werkzeug method string; older hashes are upgraded on login
+    app.config['PASSWORD_HASH_WORKERS'] = 2  # processes hashing passwords; 0 hashes inline in the request
+    app.config['PASSWORD_HASH_QUEUE'] = 32  # hashes in flight before auth requests get a 503
+    app.config['PASSWORD_HASH_TIMEOUT'] = 10  # seconds
+    app.config['LOGIN_RATE_LIMIT_IP'] = (20, 60)  # login/register attempts per client IP per N seconds
+    app.config['LOGIN_RATE_LIMIT_USER'] = (5, 60)  # login attempts per username per N seconds
+    app.config['UPLOAD_MAX_AGE'] = 365 * 24 * 60 * 60  # upload filenames are content hashes (or uuid-prefixed), so never change
+    app.config['RENDITION_FALLBACK_MAX_AGE'] = 300  # seconds; the original served while a ?size= rendition is missing
+    app.config['RENDITION_SIZES'] = {'thumb': 320, 'medium': 1024}  # longest side in pixels
+    app.config['RENDITION_QUALITY'] = 82
+    app.config['UPLOAD_WORKERS'] = 2  # background threads post-processing uploads
+    app.config['UPLOAD_JOB_STALE_SECONDS'] = 600  # requeue jobs left running by a dead worker
+    app.config['RESUME_UPLOAD_JOBS'] = True  # each worker resubmits queued jobs on its first request
+    app.config['AUTO_MIGRATE'] = False  # create_app() applies migrations itself (run once, e.g. under --preload)
+    app.config['STREAM_BATCH_SECONDS'] = 0.25  # coalescing window for /api/stream events
+    app.config['STREAM_KEEPALIVE_SECONDS'] = 15
+    app.config['STREAM_QUEUE_SIZE'] = 100  # events buffered per client before it is dropped
+    app.config['VOTE_WRITE_BEHIND'] = False  # queue votes and insert them in batches
+    app.config['VOTE_DURABLE'] = False  # with write-behind, wait for the batch commit (override with ?durable=1)
+    app.config['VOTE_FLUSH_SECONDS'] = 0.2
+    app.config['VOTE_FLUSH_BATCH'] = 500
+    app.config['VOTE_BLOOM_CAPACITY'] = 5_000_000  # existing votes tracked at ~1% false positives
+    app.config['SEARCH_RANK_CANDIDATES'] = 1000  # newest full-text matches ranked per search; bounds short-prefix latency
+    app.config['COMMENT_MAX_LENGTH'] = 2000
+    app.config['BULK_MODERATION_MAX'] = 5000  # artworks per bulk moderation request
+    app.config['BULK_MODERATION_CHUNK'] = 500  # rows per UPDATE/commit
+    app.config['COMMENT_RATE_LIMIT'] = (5, 60)  # comments per user per N seconds
+    app.config['METRICS_ENABLED'] = False  # per-route latency, SQL and size metrics at /api/admin/metrics
+    app.config['METRICS_LATENCY_BUCKETS'] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)  # seconds
+    app.config['PROFILE_SAMPLE_RATE'] = 0.0  # fraction of requests run under cProfile (needs METRICS_ENABLED)
+    app.config['PROFILE_SLOW_SECONDS'] = 1.0  # sampled requests slower than this are dumped to PROFILE_DIR
+    app.config['PROFILE_DIR'] = 'profiles'
+    app.config['SQLITE_PRAGMAS'] = {
+        'journal_mode': 'WAL',  # readers no longer wait for vote commits
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,  # ms to wait for the write lock instead of failing
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # KiB (negative) per connection
+    }
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Database Engine
+def normalize_database_url(url):
+    # Hosted Postgres often hands out the scheme SQLAlchemy 1.4+ rejects
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def configure_database(config, environ=os.environ):
+    """Apply DATABASE_URL / DATABASE_READ_URL from the environment."""
+    if environ.get('DATABASE_URL'):
+        config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(environ['DATABASE_URL'])
+    if environ.get('DATABASE_READ_URL'):
+        config['SQLALCHEMY_BINDS'] = {'read': normalize_database_url(environ['DATABASE_READ_URL'])}
+
+def is_memory_sqlite(url):
+    # Flask-SQLAlchemy shares one connection to these through a StaticPool
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and (url.database in (None, '', ':memory:')
+                                                   or url.query.get('mode') == 'memory')
+
+def configure_engine_options(config, environ=os.environ):
+    """Merge pool settings from the environment under SQLALCHEMY_ENGINE_OPTIONS.
+
+    Runs once the final database URLs are known, since only queue pools take
+    a size: it is left out for in-memory SQLite or an explicit poolclass.
+    """
+    options = {
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+    urls = [config['SQLALCHEMY_DATABASE_URI'], *(config.get('SQLALCHEMY_BINDS') or {}).values()]
+    explicit = config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if 'poolclass' not in explicit and not any(isinstance(url, str) and is_memory_sqlite(url) for url in urls):
+        options.update({
+            'pool_size': int(environ.get('DB_POOL_SIZE', 10)),
+            'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 20)),
+            'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', 30)),
+        })
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {**options, **explicit}
+
+@event.listens_for(Engine, 'connect')
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection) or not has_app_context():
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in current_app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """Sends reads in `read_replica` views to the 'read' bind when one is configured."""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and has_request_context()
+                and g.get('use_read_replica') and 'read' in self._db.engines):
+            return self._db.engines['read']
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_replica(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_read_replica = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Every route, hook and CLI command hangs off this blueprint; create_app() registers it
+bp = Blueprint('festival', __name__, cli_group=None)
 
 # Database Models
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)  # scrypt hashes outgrow 128
     is_admin = db.Column(db.Boolean, default=False)
+    auth_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')  # bumped on role change
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -56,20 +200,63 @@ class Artwork(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
     is_featured = db.Column(db.Boolean, default=False)
     is_approved = db.Column(db.Boolean, default=False)
+    is_rejected = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # hidden from the pending queue
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Denormalized counters, kept in step with the Vote/Comment tables by the
+    # write paths and rebuilt by `flask recount-artworks`
+    vote_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Resized copies stored next to the original, e.g. {'thumb': ..., 'thumb_webp': ...}
+    renditions = db.Column(db.JSON)
+    processing_status = db.Column(db.String(20), nullable=False, default='ready', server_default='ready')  # pending, ready, failed
+    blob_sha256 = db.Column(db.String(64), db.ForeignKey('blob.sha256'))  # NULL for pre-blob uploads
+    
     # Relationships
     votes = db.relationship('Vote', backref='artwork', lazy=True, cascade='all, delete-orphan')
     comments = db.relationship('Comment', backref='artwork', lazy=True, cascade='all, delete-orphan')
     
-    @property
-    def vote_count(self):
-        return len(self.votes)
+    # One index per listing shape: the equality filters first, then the sort
+    # key and id so ORDER BY ... LIMIT walks the index without a sort
+    __table_args__ = (
+        db.Index('ix_artwork_approved_created', 'is_approved', 'created_at', 'id'),
+        db.Index('ix_artwork_approved_category_created', 'is_approved', 'category_id', 'created_at', 'id'),
+        db.Index('ix_artwork_approved_featured_created', 'is_approved', 'is_featured', 'created_at', 'id'),
+        db.Index('ix_artwork_approved_title', 'is_approved', 'title', 'id'),
+        db.Index('ix_artwork_approved_votes', 'is_approved', 'vote_count', 'id'),
+        db.Index('ix_artwork_created', 'created_at', 'id'),
+        db.Index('ix_artwork_category', 'category_id'),
+        db.Index('ix_artwork_artist', 'artist_id'),
+        db.Index('ix_artwork_blob', 'blob_sha256'),
+    )
+
+class Blob(db.Model):
+    # Uploaded content stored once per SHA-256 of the bytes as received
+    sha256 = db.Column(db.String(64), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ChunkedUpload(db.Model):
+    # A resumable upload in progress; bytes accumulate in incoming/<id>.part
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+    size = db.Column(db.Integer, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    received = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    @property
-    def comment_count(self):
-        return len(self.comments)
+    __table_args__ = (
+        db.Index('ix_chunked_upload_user', 'user_id'),
+        db.Index('ix_chunked_upload_updated', 'updated_at'),
+    )
 
 class Vote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -77,14 +264,36 @@ class Vote(db.Model):
     artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    __table_args__ = (db.UniqueConstraint('user_id', 'artwork_id', name='unique_vote'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'artwork_id', name='unique_vote'),
+        db.Index('ix_vote_artwork', 'artwork_id'),
+    )
 
 class Comment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('comment.id'))  # replies point at a top-level comment
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_comment_artwork_created', 'artwork_id', 'created_at', 'id'),
+        db.Index('ix_comment_parent_created', 'parent_id', 'created_at', 'id'),
+    )
+
+class UploadJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    artwork = db.relationship('Artwork')
+    
+    __table_args__ = (db.Index('ix_upload_job_status', 'status'),)
 
 class FestivalSettings(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -92,6 +301,18 @@ class FestivalSettings(db.Model):
     value = db.Column(db.Text)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class TableVersion(db.Model):
+    # Bumped in the same transaction as every write to `name`; ETags are
+    # derived from these instead of hashing response bodies
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class SchemaMigration(db.Model):
+    id = db.Column(db.String(100), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+VERSIONED_TABLES = ('user', 'category', 'artwork', 'vote', 'comment')
+
 # Helper Functions
 def login_required(f):
     @wraps(f)
@@ -107,18 +328,1319 @@ def admin_required(f):
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin:
+        principal = current_principal()
+        if not principal or not principal.is_admin:
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
 
+def adjust_artwork_counter(artwork_id, column, delta):
+    # Single UPDATE so concurrent voters never lose an increment
+    Artwork.query.filter_by(id=artwork_id).update(
+        {column: db.case((column + delta < 0, 0), else_=column + delta)}, synchronize_session=False
+    )
+
+def get_artwork_counter(artwork_id, column):
+    return db.session.query(column).filter(Artwork.id == artwork_id).scalar() or 0
+
+def artwork_query():
+    # Artist and category ride along in the same SELECT, so serializing a page
+    # never falls back to one lazy load per row
+    return Artwork.query.options(db.joinedload(Artwork.artist), db.joinedload(Artwork.category))
+
+def rendition_urls(artwork):
+    return {name: f'/uploads/{filename}' for name, filename in (artwork.renditions or {}).items()}
+
+def serialize_artwork(artwork):
+    return {
+        'id': artwork.id,
+        'title': artwork.title,
+        'description': artwork.description,
+        'filename': artwork.filename,
+        'file_path': f'/uploads/{artwork.filename}',
+        'renditions': rendition_urls(artwork),
+        'artist': {
+            'id': artwork.artist.id,
+            'username': artwork.artist.username
+        },
+        'category': {
+            'id': artwork.category.id,
+            'name': artwork.category.name
+        } if artwork.category else None,
+        'vote_count': artwork.vote_count,
+        'comment_count': artwork.comment_count,
+        'is_featured': artwork.is_featured,
+        'created_at': artwork.created_at.isoformat()
+    }
+
+def serialize_admin_artwork(artwork):
+    return {
+        'id': artwork.id,
+        'title': artwork.title,
+        'description': artwork.description,
+        'artist': artwork.artist.username,
+        'category': artwork.category.name if artwork.category else None,
+        'is_approved': artwork.is_approved,
+        'is_rejected': artwork.is_rejected,
+        'is_featured': artwork.is_featured,
+        'vote_count': artwork.vote_count,
+        'processing_status': artwork.processing_status,
+        'created_at': artwork.created_at.isoformat(),
+        'file_path': f'/uploads/{artwork.filename}',
+        'renditions': rendition_urls(artwork)
+    }
+
+# Sort key column and direction (descending?) for each artwork listing order;
+# Artwork.id breaks ties so both page and cursor modes have a total order
+ARTWORK_SORTS = {
+    'recent': (Artwork.created_at, True),
+    'popular': (Artwork.vote_count, True),
+    'title': (Artwork.title, False),
+}
+
+def arg_flag(name):
+    return request.args.get(name, '').lower() in ('1', 'true', 'yes')
+
+def order_artworks(query, sort_by):
+    column, descending = ARTWORK_SORTS.get(sort_by, ARTWORK_SORTS['recent'])
+    if descending:
+        return query.order_by(column.desc(), Artwork.id.desc())
+    return query.order_by(column.asc(), Artwork.id.asc())
+
+# JSON type of the sort key in a cursor token; datetimes travel as ISO strings
+CURSOR_KEY_TYPES = {'recent': str, 'comments': str, 'popular': int, 'title': str}
+
+def encode_cursor(sort_by, key, row_id):
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps([sort_by, key, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(sort_by, token):
+    """Return the (sort key, id) in a cursor token, or None if it is not valid for `sort_by`."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        cursor_sort, key, row_id = json.loads(raw)
+        if cursor_sort != sort_by:
+            raise ValueError('cursor belongs to a different sort')
+        key_type = CURSOR_KEY_TYPES[sort_by]
+        # bool is an int subclass but never a valid key or id
+        if type(row_id) is not int or type(key) is not key_type:
+            raise ValueError('cursor key has the wrong type')
+        if sort_by in ('recent', 'comments'):
+            key = datetime.fromisoformat(key)
+    except (ValueError, TypeError):
+        return None
+    return key, row_id
+
+def cursor_paginate(query, sort_by, per_page):
+    """Keyset pagination over an already-filtered artwork query.
+
+    Seeks past the (sort key, id) pair in the `after` token instead of using
+    OFFSET, and only counts the filtered set when `include_total` is passed.
+    Returns (artworks, pagination) or (None, error message).
+    """
+    if sort_by not in ARTWORK_SORTS:
+        sort_by = 'recent'
+    column, descending = ARTWORK_SORTS[sort_by]
+    per_page = max(per_page, 1)
+    total = query.order_by(None).count() if arg_flag('include_total') else None
+    
+    after = request.args.get('after')
+    if after:
+        decoded = decode_cursor(sort_by, after)
+        if decoded is None:
+            return None, 'Invalid cursor'
+        key, last_id = decoded
+        if descending:
+            query = query.filter(db.or_(column < key, db.and_(column == key, Artwork.id < last_id)))
+        else:
+            query = query.filter(db.or_(column > key, db.and_(column == key, Artwork.id > last_id)))
+    
+    rows = order_artworks(query, sort_by).limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_next = len(rows) > per_page
+    pagination = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': encode_cursor(sort_by, getattr(items[-1], column.key), items[-1].id) if has_next and items else None
+    }
+    if total is not None:
+        pagination['total'] = total
+    return items, pagination
+
+def rendition_filename(filename, size, ext):
+    return f"{filename.rsplit('.', 1)[0]}.{size}.{ext}"
+
+BLOB_FILENAME = re.compile(r'^([0-9a-f]{64})\.')
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def storage_path(filename):
+    """Map a public upload filename to its path relative to UPLOAD_FOLDER.
+
+    Blob files (and their renditions) live in blobs/<aa>/<bb>/ sharded by
+    hash prefix; older uuid-named uploads stay in the flat folder.
+    """
+    match = BLOB_FILENAME.match(filename)
+    if not match:
+        return filename
+    digest = match.group(1)
+    return '/'.join(('blobs', digest[:2], digest[2:4], filename))
+
+def add_blob_file(tmp_path, sha256, size, ext):
+    """Move a fully written file into blob storage unless its content is already there.
+
+    Returns the Blob row for the content, inserting it unless identical bytes
+    were uploaded before. `tmp_path` is consumed either way.
+    """
+    try:
+        blob = db.session.get(Blob, sha256)
+        if blob is not None:
+            return blob
+        
+        filename = f'{sha256}.{ext}'
+        final_path = os.path.join(current_app.config['UPLOAD_FOLDER'], storage_path(filename))
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        # Concurrent uploads of the same bytes may both get here; the rename is
+        # atomic and the insert keeps whichever row lands first
+        os.replace(tmp_path, final_path)
+        insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+        db.session.execute(insert(Blob)
+                           .values(sha256=sha256, filename=filename, size=size, created_at=datetime.utcnow())
+                           .on_conflict_do_nothing(index_elements=['sha256']))
+        return db.session.get(Blob, sha256)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def store_upload(stream, ext):
+    """Stream an upload to disk while hashing it, storing each distinct content once."""
+    blob_folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'blobs')
+    os.makedirs(blob_folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=blob_folder, suffix='.part')
+    with os.fdopen(fd, 'wb') as out:
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    return add_blob_file(tmp_path, digest.hexdigest(), size, ext)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def generate_renditions(file_path, filename):
+    """Write resized JPEG/PNG and WebP copies of an upload next to it.
+
+    Returns the {name: filename} map to store on Artwork.renditions, or an
+    empty map if Pillow is unavailable or the file cannot be decoded.
+    """
+    if Image is None:
+        return {}
+    folder = os.path.dirname(file_path)
+    quality = current_app.config['RENDITION_QUALITY']
+    renditions = {}
+    try:
+        with Image.open(file_path) as source:
+            image = ImageOps.exif_transpose(source)
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        for size, max_side in current_app.config['RENDITION_SIZES'].items():
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side), Image.LANCZOS)
+            fallback = ('png', {'optimize': True}) if has_alpha else ('jpg', {'quality': quality, 'optimize': True, 'progressive': True})
+            for name, (ext, options) in ((size, fallback), (f'{size}_webp', ('webp', {'quality': quality, 'method': 4}))):
+                rendition = rendition_filename(filename, size, ext)
+                # Write-then-rename: duplicate uploads of one blob may render concurrently
+                tmp_path = os.path.join(folder, f'{rendition}.{uuid.uuid4().hex}.part')
+                variant.save(tmp_path, format='JPEG' if ext == 'jpg' else ext.upper(), **options)
+                os.replace(tmp_path, os.path.join(folder, rendition))
+                renditions[name] = rendition
+    except (OSError, Image.DecompressionBombError) as exc:
+        current_app.logger.warning('Could not create renditions for %s: %s', filename, exc)
+        return {}
+    return renditions
+
 def allowed_file(filename):
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def validate_artwork_upload(title, filename):
+    """Return the error message for an unacceptable upload, or None."""
+    if not title:
+        return 'Title is required'
+    if not filename:
+        return 'No file selected'
+    if not allowed_file(filename):
+        return 'Invalid file type'
+    return None
+
+class TokenBucketLimiter:
+    """Per-key token buckets; `config_key` names a (capacity, period in seconds) setting."""
+    
+    def __init__(self, config_key, max_keys=100_000):
+        self.config_key = config_key
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+    
+    def acquire(self, key):
+        """Take a token for `key`; return 0 on success or the seconds to wait."""
+        capacity, period = current_app.config[self.config_key]
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / rate
+
+def rate_limited(seconds):
+    response = jsonify({'error': 'Too many requests, please slow down'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(math.ceil(seconds))
+    return response
+
+# Leaderboard
+class Leaderboard:
+    """In-process ranking of approved artworks by vote count.
+
+    Entries are kept in lists sorted by (-votes, -id), one for all approved
+    artworks plus one per category, per featured flag and per featured
+    category, so a vote moves an artwork with a few binary searches and a
+    filtered page is a slice instead of a scan. Artwork.vote_count is the source of truth: the index is rebuilt
+    from it on first use and every LEADERBOARD_REFRESH_SECONDS, which also
+    picks up votes recorded by other worker processes.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}  # (category_id | None, featured only?) -> sorted (-votes, -artwork_id)
+        self._entries = {}  # artwork_id -> (votes, category_id, is_featured)
+        self._loaded_at = None
+    
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+    
+    def _ensure_loaded(self):
+        refresh = current_app.config['LEADERBOARD_REFRESH_SECONDS']
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < refresh:
+            return
+        rows = (db.session.query(Artwork.id, Artwork.vote_count, Artwork.category_id, Artwork.is_featured)
+                .filter(Artwork.is_approved == True)
+                .all())
+        self._entries = {row.id: (row.vote_count, row.category_id, bool(row.is_featured)) for row in rows}
+        self._indexes = {}
+        for artwork_id, (votes, category_id, is_featured) in self._entries.items():
+            for name in self._index_names(category_id, is_featured):
+                self._indexes.setdefault(name, []).append((-votes, -artwork_id))
+        for keys in self._indexes.values():
+            keys.sort()
+        self._loaded_at = time.monotonic()
+    
+    @staticmethod
+    def _index_names(category_id, is_featured):
+        names = [(None, False)]
+        if category_id:
+            names.append((category_id, False))
+        if is_featured:
+            names.append((None, True))
+            if category_id:
+                names.append((category_id, True))
+        return names
+    
+    def _remove(self, artwork_id):
+        entry = self._entries.pop(artwork_id, None)
+        if entry is not None:
+            votes, category_id, is_featured = entry
+            for name in self._index_names(category_id, is_featured):
+                keys = self._indexes[name]
+                del keys[bisect.bisect_left(keys, (-votes, -artwork_id))]
+        return entry
+    
+    def _insert(self, artwork_id, votes, category_id, is_featured):
+        self._entries[artwork_id] = (votes, category_id, is_featured)
+        for name in self._index_names(category_id, is_featured):
+            bisect.insort(self._indexes.setdefault(name, []), (-votes, -artwork_id))
+    
+    def get_votes(self, artwork_id):
+        """Vote count of an approved artwork, or None if it is not approved."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(artwork_id)
+            return entry[0] if entry else None
+    
+    def set_votes(self, artwork_id, votes):
+        with self._lock:
+            if self._loaded_at is None or artwork_id not in self._entries:
+                return
+            _, category_id, is_featured = self._remove(artwork_id)
+            self._insert(artwork_id, votes, category_id, is_featured)
+    
+    def put(self, artwork):
+        """Add or refresh an artwork, dropping it if it is not approved."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove(artwork.id)
+            if artwork.is_approved:
+                self._insert(artwork.id, artwork.vote_count, artwork.category_id, bool(artwork.is_featured))
+    
+    def top(self, limit):
+        with self._lock:
+            self._ensure_loaded()
+            ids = []
+            for neg_votes, neg_id in self._indexes.get((None, False), [])[:limit]:
+                if neg_votes == 0:
+                    break
+                ids.append(-neg_id)
+            return ids
+    
+    def page(self, offset, limit, category_id=None, featured_only=False):
+        """Return (artwork ids, total) for one page of the popular ordering."""
+        with self._lock:
+            self._ensure_loaded()
+            keys = self._indexes.get((category_id or None, bool(featured_only)), [])
+            return [-neg_id for _, neg_id in keys[offset:offset + limit]], len(keys)
+
+leaderboard = Leaderboard()
+
+def load_artworks_in_order(artwork_ids):
+    artworks = {artwork.id: artwork for artwork in artwork_query().filter(Artwork.id.in_(artwork_ids))}
+    return [artworks[artwork_id] for artwork_id in artwork_ids if artwork_id in artworks]
+
+# Search
+# FTS5 index over approved artworks (rowid = artwork id). Other databases,
+# or SQLite builds without FTS5, fall back to LIKE matching.
+SEARCH_TABLE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS artwork_search USING fts5("
+    "title, description, artist, category, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+SEARCH_RANKING = 'bm25(artwork_search, 10.0, 1.0, 4.0, 2.0)'  # title, description, artist, category
+SEARCH_MAX_TERMS = 8
+SEARCH_MIN_PREFIX = 2  # shorter terms only match whole words; the index has no 1-character prefixes
+
+search_index_available = None
+
+def has_search_index():
+    global search_index_available
+    if search_index_available is None:
+        search_index_available = db.inspect(db.engine).has_table('artwork_search')
+    return search_index_available
+
+def index_artwork(artwork):
+    """Add, refresh or drop one artwork's search entry in the current transaction."""
+    if not has_search_index():
+        return
+    db.session.execute(db.text('DELETE FROM artwork_search WHERE rowid = :id'), {'id': artwork.id})
+    if artwork.is_approved:
+        db.session.execute(
+            db.text('INSERT INTO artwork_search (rowid, title, description, artist, category) '
+                    'VALUES (:id, :title, :description, :artist, :category)'),
+            {'id': artwork.id, 'title': artwork.title, 'description': artwork.description or '',
+             'artist': artwork.artist.username, 'category': artwork.category.name if artwork.category else ''}
+        )
+
+SEARCH_INDEX_INSERT = (
+    'INSERT INTO artwork_search (rowid, title, description, artist, category) '
+    "SELECT a.id, a.title, COALESCE(a.description, ''), u.username, COALESCE(c.name, '') "
+    'FROM artwork a JOIN "user" u ON u.id = a.artist_id LEFT JOIN category c ON c.id = a.category_id '
+    'WHERE a.is_approved = 1'
+)
+
+def rebuild_search_index():
+    db.session.execute(db.text('DELETE FROM artwork_search'))
+    db.session.execute(db.text(SEARCH_INDEX_INSERT))
+
+def index_artworks(ids):
+    """Set-based index_artwork() for a batch of artwork ids."""
+    if not has_search_index() or not ids:
+        return
+    params = {'ids': list(ids)}
+    db.session.execute(db.text('DELETE FROM artwork_search WHERE rowid IN :ids')
+                       .bindparams(db.bindparam('ids', expanding=True)), params)
+    db.session.execute(db.text(SEARCH_INDEX_INSERT + ' AND a.id IN :ids')
+                       .bindparams(db.bindparam('ids', expanding=True)), params)
+
+def search_terms(text):
+    return re.findall(r'\w+', text)[:SEARCH_MAX_TERMS]
+
+def search_artwork_ids(terms, offset, limit):
+    """Ids of approved artworks matching every term as a prefix, best match first.
+
+    With the full-text index only the SEARCH_RANK_CANDIDATES newest matches
+    are ranked, so a short prefix matching most of the table costs no more
+    than a specific word; results end after that many.
+    """
+    if has_search_index():
+        match = ' '.join(f'"{term}"*' if len(term) >= SEARCH_MIN_PREFIX else f'"{term}"' for term in terms)
+        rows = db.session.execute(
+            db.text(f'SELECT rowid FROM ('
+                    f'SELECT rowid, {SEARCH_RANKING} AS score FROM artwork_search '
+                    f'WHERE artwork_search MATCH :match ORDER BY rowid DESC LIMIT :candidates'
+                    f') ORDER BY score, rowid DESC LIMIT :limit OFFSET :offset'),
+            {'match': match, 'candidates': current_app.config['SEARCH_RANK_CANDIDATES'],
+             'limit': limit, 'offset': offset}
+        )
+        return [row[0] for row in rows]
+    
+    query = (db.session.query(Artwork.id)
+             .join(User, User.id == Artwork.artist_id)
+             .outerjoin(Category, Category.id == Artwork.category_id)
+             .filter(Artwork.is_approved == True))
+    for term in terms:
+        pattern = f'%{term}%'
+        query = query.filter(db.or_(Artwork.title.ilike(pattern), Artwork.description.ilike(pattern),
+                                    User.username.ilike(pattern), Category.name.ilike(pattern)))
+    rows = order_artworks(query, 'recent').offset(offset).limit(limit)
+    return [row[0] for row in rows]
+
+# Response Cache
+class LRUCacheBackend:
+    """In-process LRU store with per-entry TTL.
+
+    This is the whole backend interface (get/set/incr/counter); a shared
+    store such as Redis can implement the same four methods so that
+    generation bumps are seen by every worker.
+    """
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+    
+    def counter(self, key):
+        return self._counters.get(key, 0)
+    
+    def __len__(self):
+        return len(self._entries)
+
+class ResponseCache:
+    """Caches JSON responses per namespace and query string.
+
+    Each namespace carries a generation number that is part of every key,
+    as does the global '*' generation, so invalidating is a single counter
+    bump; superseded entries simply age out of the backend. Under
+    conditional_response the ETag is part of the key too, so a body cached
+    before a table version bump is never served with the newer ETag.
+    """
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, namespace):
+        generation = self.backend.counter(f'generation:{namespace}')
+        global_generation = self.backend.counter('generation:*')
+        args = sorted(request.args.items(multi=True))
+        etag = g.get('response_etag', '')
+        return f'{namespace}:{generation}:{global_generation}:{etag}:{request.path}:{args!r}'
+    
+    def get(self, namespace):
+        cached = self.backend.get(self.key(namespace))
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+    
+    def set(self, namespace, response):
+        self.backend.set(self.key(namespace), response.get_data(), current_app.config['RESPONSE_CACHE_TTL'])
+    
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.incr(f'generation:{namespace}')
+    
+    def invalidate_all(self):
+        self.backend.incr('generation:*')
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.backend)
+        }
+
+response_cache = ResponseCache(LRUCacheBackend())  # sized by create_app()
+
+def cached_response(namespace):
+    """Serve successful responses of an anonymous GET view from response_cache.
+
+    `namespace` may reference the view's URL arguments, e.g. 'artwork:{artwork_id}'.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            name = namespace.format(**kwargs)
+            body = response_cache.get(name)
+            if body is not None:
+                response = current_app.response_class(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(name, response)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
+
+# Principals
+Principal = namedtuple('Principal', 'id username email is_admin auth_version')
+
+principal_cache = LRUCacheBackend()  # sized by create_app()
+
+def get_principal(user_id):
+    """The user's identity and role, read through a short-lived per-worker cache."""
+    key = f'principal:{user_id}:{principal_cache.counter(f"principal:{user_id}")}'
+    principal = principal_cache.get(key)
+    if principal is None:
+        row = (db.session.query(User.id, User.username, User.email, User.is_admin, User.auth_version)
+               .filter(User.id == user_id).first())
+        if row is None:
+            return None
+        principal = Principal(*row)
+        principal_cache.set(key, principal, current_app.config['PRINCIPAL_CACHE_TTL'])
+    return principal
+
+def invalidate_principal(user_id):
+    principal_cache.incr(f'principal:{user_id}')
+
+def current_principal():
+    """The logged-in principal; refreshes the session's role if it changed since login."""
+    principal = get_principal(session['user_id'])
+    if principal and principal.auth_version != session.get('auth_version'):
+        session['is_admin'] = principal.is_admin
+        session['auth_version'] = principal.auth_version
+    return principal
+
+def start_session(user):
+    session['user_id'] = user.id
+    session['username'] = user.username
+    session['is_admin'] = user.is_admin
+    session['auth_version'] = user.auth_version
+
+def set_user_role(user_id, is_admin):
+    """Grant or revoke admin; bumping auth_version makes existing sessions pick it up."""
+    updated = User.query.filter_by(id=user_id).update(
+        {User.is_admin: is_admin, User.auth_version: User.auth_version + 1}, synchronize_session=False
+    )
+    bump_table_versions('user')
+    db.session.commit()
+    invalidate_principal(user_id)
+    return bool(updated)
+
+# Password Hashing
+# Hashing is deliberately slow and CPU-bound, so it runs in worker processes
+# where it cannot hold the request worker's GIL
+class PasswordHashingBusy(Exception):
+    pass
+
+password_pool = None
+password_pool_lock = threading.Lock()
+password_slots = None  # sized by create_app()
+
+def get_password_pool():
+    global password_pool
+    with password_pool_lock:
+        if password_pool is None:
+            password_pool = ProcessPoolExecutor(max_workers=current_app.config['PASSWORD_HASH_WORKERS'],
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return password_pool
+
+def run_password_hashing(fn, *args):
+    global password_pool
+    if not current_app.config['PASSWORD_HASH_WORKERS']:
+        return fn(*args)
+    slots = password_slots
+    if not slots.acquire(blocking=False):
+        raise PasswordHashingBusy()
+    try:
+        future = get_password_pool().submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError):
+        slots.release()
+        with password_pool_lock:
+            password_pool = None
+        raise PasswordHashingBusy()
+    # The slot is held until a worker is done with the hash, not just until this request gives up
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=current_app.config['PASSWORD_HASH_TIMEOUT'])
+    except FutureTimeoutError:
+        future.cancel()  # drops it if still queued; a running hash frees its slot when it finishes
+        raise PasswordHashingBusy()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool for the next request
+        with password_pool_lock:
+            password_pool = None
+        raise PasswordHashingBusy()
+
+def hash_password(password):
+    return run_password_hashing(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+def verify_password(password_hash, password):
+    return run_password_hashing(check_password_hash, password_hash, password)
+
+def password_needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != current_app.config['PASSWORD_HASH_METHOD']
+
+# Conditional Requests
+def bump_table_versions(*tables):
+    TableVersion.query.filter(TableVersion.name.in_(tables)).update(
+        {TableVersion.version: TableVersion.version + 1}, synchronize_session=False
+    )
+
+def etag_for(tables, view_args):
+    versions = dict(db.session.query(TableVersion.name, TableVersion.version)
+                    .filter(TableVersion.name.in_(tables)))
+    args = sorted(request.args.items(multi=True))
+    state = [request.endpoint, sorted(view_args.items()), args, [versions.get(t, 0) for t in tables]]
+    return hashlib.sha1(repr(state).encode()).hexdigest()
+
+def conditional_response(*tables):
+    """Tag a GET view with an ETag built from the versions of `tables`.
+
+    A matching If-None-Match is answered with 304 before the view (or the
+    response cache) runs.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = etag_for(tables, kwargs)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                g.response_etag = etag
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response
+        return decorated_function
+    return decorator
+
+# Upload Processing
+upload_executor = None
+upload_executor_lock = threading.Lock()
+
+def get_upload_executor():
+    global upload_executor
+    with upload_executor_lock:
+        if upload_executor is None:
+            upload_executor = ThreadPoolExecutor(max_workers=current_app.config['UPLOAD_WORKERS'],
+                                                 thread_name_prefix='upload')
+        return upload_executor
+
+def strip_exif(file_path):
+    """Write a copy of the image without EXIF; returns its path, or None if there is nothing to drop.
+
+    The original is left alone: blob files are named by their hash and
+    served as immutable, so cleaned bytes have to become a blob of their own.
+    """
+    # Re-encode only when there is metadata to drop; orientation is baked
+    # into the pixels first so the image does not appear rotated afterwards
+    with Image.open(file_path) as image:
+        if 'exif' not in image.info or getattr(image, 'is_animated', False):
+            return None
+        image_format = image.format
+        cleaned = ImageOps.exif_transpose(image)
+        cleaned.info.pop('exif', None)
+    options = {'quality': 95} if image_format == 'JPEG' else {}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.part')
+    with os.fdopen(fd, 'wb') as out:
+        cleaned.save(out, format=image_format, **options)
+    return tmp_path
+
+def is_published_blob(sha256):
+    # Blob files are only served once an artwork's upload job has finished
+    # with them, so an original still carrying EXIF is never public
+    return (db.session.query(Artwork.id)
+            .filter(Artwork.blob_sha256 == sha256, Artwork.processing_status == 'ready')
+            .first()) is not None
+
+def process_upload(artwork):
+    """Validate, clean and render one uploaded file; raises ValueError if it is not an image."""
+    if artwork.blob_sha256:
+        # Identical content was processed before; reuse its files
+        done = (Artwork.query
+                .filter(Artwork.blob_sha256 == artwork.blob_sha256, Artwork.id != artwork.id,
+                        Artwork.processing_status == 'ready', Artwork.renditions.isnot(None))
+                .first())
+        if done is not None:
+            artwork.renditions = done.renditions
+            return
+    if Image is not None:
+        try:
+            with Image.open(artwork.file_path) as image:
+                image.verify()
+        except (OSError, SyntaxError, Image.DecompressionBombError):
+            raise ValueError('Uploaded file is not a valid image')
+        cleaned_path = strip_exif(artwork.file_path)
+        if cleaned_path is not None:
+            blob = add_blob_file(cleaned_path, file_sha256(cleaned_path), os.path.getsize(cleaned_path),
+                                 artwork.filename.rsplit('.', 1)[1].lower())
+            artwork.filename = blob.filename
+            artwork.file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], storage_path(blob.filename))
+            artwork.blob_sha256 = blob.sha256
+    artwork.renditions = generate_renditions(artwork.file_path, artwork.filename)
+
+def run_upload_job(app, job_id):
+    with app.app_context():
+        # Claim the job atomically so two workers resuming the queue never both run it
+        claimed = UploadJob.query.filter_by(id=job_id, status='queued').update(
+            {UploadJob.status: 'running', UploadJob.attempts: UploadJob.attempts + 1,
+             UploadJob.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if not claimed:
+            return
+        
+        job = db.session.get(UploadJob, job_id)
+        artwork = job.artwork
+        try:
+            process_upload(artwork)
+            job.status, job.error = 'done', None
+            artwork.processing_status = 'ready'
+        except Exception as exc:
+            current_app.logger.exception('Processing upload job %s failed', job_id)
+            db.session.rollback()
+            job.status, job.error = 'failed', str(exc)
+            artwork.processing_status = 'failed'
+        bump_table_versions('artwork')
+        db.session.commit()
+        if artwork.is_approved:
+            response_cache.invalidate('artworks', f'artwork:{artwork.id}')
+
+def enqueue_upload_job(job_id):
+    get_upload_executor().submit(run_upload_job, current_app._get_current_object(), job_id)
+
+upload_jobs_resumed = False
+
+@bp.before_app_request
+def resume_upload_jobs_once():
+    # Runs in each worker after it forks, so a preloading master never starts threads
+    global upload_jobs_resumed
+    if upload_jobs_resumed or not current_app.config['RESUME_UPLOAD_JOBS']:
+        return
+    upload_jobs_resumed = True
+    resume_upload_jobs()
+
+def resume_upload_jobs():
+    """Requeue jobs interrupted by a restart and submit everything still queued."""
+    stale_before = datetime.utcfromtimestamp(time.time() - current_app.config['UPLOAD_JOB_STALE_SECONDS'])
+    UploadJob.query.filter(UploadJob.status == 'running', UploadJob.updated_at < stale_before).update(
+        {UploadJob.status: 'queued'}, synchronize_session=False
+    )
+    db.session.commit()
+    job_ids = [job_id for job_id, in db.session.query(UploadJob.id).filter_by(status='queued')]
+    for job_id in job_ids:
+        enqueue_upload_job(job_id)
+    return len(job_ids)
+
+def backfill_renditions():
+    """Queue an upload job for every artwork without renditions; returns how many."""
+    in_progress = db.exists().where(UploadJob.artwork_id == Artwork.id, UploadJob.status.in_(('queued', 'running')))
+    artwork_ids = [artwork_id for artwork_id, in
+                   db.session.query(Artwork.id).filter(Artwork.renditions.is_(None), ~in_progress)]
+    for start in range(0, len(artwork_ids), 1000):
+        db.session.execute(db.insert(UploadJob),
+                           [{'artwork_id': artwork_id} for artwork_id in artwork_ids[start:start + 1000]])
+    db.session.commit()
+    return len(artwork_ids)
+
+def serialize_upload_job(job):
+    return {
+        'id': job.id,
+        'artwork_id': job.artwork_id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error,
+        'status_url': f'/api/uploads/{job.id}',
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat()
+    }
+
+# Live Events
+class EventBus:
+    """In-process pub/sub feeding the /api/stream Server-Sent Events endpoint.
+
+    Writers publish into a pending batch keyed by event and (optionally)
+    item, so a burst of votes on one artwork collapses into its latest
+    count. A single flusher thread ships the batch every
+    STREAM_BATCH_SECONDS and computes statistics once per batch, so clients
+    never touch the database. Events only reach clients connected to the
+    worker that handled the write; statistics reflect every worker.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._subscribers = set()
+        self._flusher = None
+        self._app = None
+    
+    def publish(self, event, data=None, key=None):
+        with self._lock:
+            if not self._subscribers:
+                return
+            if key is None:
+                self._pending[event] = data
+            else:
+                self._pending.setdefault(event, {})[key] = data
+    
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=current_app.config['STREAM_QUEUE_SIZE'])
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._flusher is None:
+                self._app = current_app._get_current_object()
+                self._flusher = threading.Thread(target=self._run, name='event-bus', daemon=True)
+                self._flusher.start()
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+    
+    def _run(self):
+        while True:
+            time.sleep(self._app.config['STREAM_BATCH_SECONDS'])
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                subscribers = list(self._subscribers)
+            if not batch or not subscribers:
+                continue
+            if 'statistics' in batch:
+                try:
+                    with self._app.app_context():
+                        batch['statistics'] = compute_statistics()
+                except Exception:
+                    self._app.logger.exception('Could not compute statistics for the event stream')
+                    del batch['statistics']
+            message = ''.join(f'event: {event}\ndata: {json.dumps(data)}\n\n' for event, data in batch.items())
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # A client this far behind reconnects and resyncs
+                    self.unsubscribe(subscriber)
+                    with subscriber.mutex:
+                        subscriber.queue.clear()
+                    subscriber.put_nowait(None)
+
+event_bus = EventBus()
+
+# Write-behind Votes
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item):
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+    
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class VoteWriter:
+    """Queues vote inserts/deletes and applies them in batched transactions.
+
+    Duplicate checks go to the pending batch and a Bloom filter of existing
+    (user_id, artwork_id) pairs, touching the database only on a filter hit.
+    The filter is loaded on a background thread; until it is ready every
+    check goes to the database. Votes cast through other workers are not in
+    this filter, so the unique_vote constraint stays the final arbiter:
+    conflicting inserts are skipped by the flush and counts are recomputed
+    from the Vote table for every artwork in the batch.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = OrderedDict()  # (user_id, artwork_id) -> ('add' | 'remove', [futures])
+        self._bloom = None
+        self._bloom_loader = None
+        self._bloom_backlog = []  # pairs added while the filter loads
+        self._flusher = None
+        self._app = None
+    
+    def _ensure_started(self):
+        # Called with self._lock held
+        if self._app is None:
+            self._app = current_app._get_current_object()
+        if self._bloom is None and self._bloom_loader is None:
+            self._bloom_loader = threading.Thread(target=self._load_bloom, name='vote-bloom', daemon=True)
+            self._bloom_loader.start()
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name='vote-writer', daemon=True)
+            self._flusher.start()
+    
+    def _load_bloom(self):
+        bloom = BloomFilter(self._app.config['VOTE_BLOOM_CAPACITY'])
+        try:
+            with self._app.app_context():
+                for pair in db.session.query(Vote.user_id, Vote.artwork_id).yield_per(10000):
+                    bloom.add(tuple(pair))
+        except Exception:
+            self._app.logger.exception('Could not load the vote Bloom filter')
+            with self._lock:
+                self._bloom_loader = None  # retried on the next check
+            return
+        with self._lock:
+            for pair in self._bloom_backlog:
+                bloom.add(pair)
+            self._bloom_backlog = []
+            self._bloom = bloom
+    
+    def has_vote(self, user_id, artwork_id, confirm_absent=False):
+        """Whether the pair has a vote, counting queued actions.
+
+        A filter miss is trusted unless `confirm_absent` is set, for callers
+        that must also see votes cast through other workers.
+        """
+        pair = (user_id, artwork_id)
+        with self._lock:
+            self._ensure_started()
+            if pair in self._pending:
+                return self._pending[pair][0] == 'add'
+            if self._bloom is not None and pair not in self._bloom and not confirm_absent:
+                return False
+        return Vote.query.filter_by(user_id=user_id, artwork_id=artwork_id).first() is not None
+    
+    def submit(self, user_id, artwork_id, action):
+        """Queue an 'add' or 'remove'; the Future resolves to whether it changed a row,
+        or None for an 'add' on an artwork that was no longer approved at flush time.
+        """
+        pair = (user_id, artwork_id)
+        future = Future()
+        with self._lock:
+            self._ensure_started()
+            if action == 'add':
+                if self._bloom is not None:
+                    self._bloom.add(pair)
+                else:
+                    self._bloom_backlog.append(pair)
+            # The latest action for a pair wins; earlier callers share its outcome
+            _, futures = self._pending.pop(pair, (None, []))
+            self._pending[pair] = (action, futures + [future])
+            if len(self._pending) >= current_app.config['VOTE_FLUSH_BATCH']:
+                self._wakeup.set()
+        return future
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._app.config['VOTE_FLUSH_SECONDS'])
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                self._app.logger.exception('Vote flush failed')
+    
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, OrderedDict()
+        if not batch:
+            return
+        try:
+            with self._app.app_context():
+                results = self._apply(batch)
+        except Exception as exc:
+            for _, futures in batch.values():
+                for future in futures:
+                    future.set_exception(exc)
+            raise
+        for pair, (_, futures) in batch.items():
+            for future in futures:
+                future.set_result(results[pair])
+    
+    def _apply(self, batch):
+        results = {pair: False for pair in batch}
+        # Approval was checked against this worker's leaderboard; another
+        # worker may have rejected the artwork since
+        add_pairs = [pair for pair, (action, _) in batch.items() if action == 'add']
+        approved = set()
+        if add_pairs:
+            approved = {artwork_id for artwork_id, in db.session.query(Artwork.id).filter(
+                Artwork.id.in_({artwork_id for _, artwork_id in add_pairs}), Artwork.is_approved == True)}
+        adds = []
+        for user_id, artwork_id in add_pairs:
+            if artwork_id in approved:
+                adds.append({'user_id': user_id, 'artwork_id': artwork_id, 'created_at': datetime.utcnow()})
+            else:
+                results[(user_id, artwork_id)] = None
+        if len(adds) < len(add_pairs):
+            self._app.logger.warning('Skipped %d queued votes for artworks that are not approved',
+                                     len(add_pairs) - len(adds))
+        if adds:
+            insert = postgresql.insert if db.engine.dialect.name == 'postgresql' else sqlite.insert
+            statement = (insert(Vote)
+                         .on_conflict_do_nothing(index_elements=['user_id', 'artwork_id'])
+                         .returning(Vote.user_id, Vote.artwork_id))
+            for pair in db.session.execute(statement, adds):
+                results[tuple(pair)] = True
+        for (user_id, artwork_id), (action, _) in batch.items():
+            if action == 'remove':
+                deleted = Vote.query.filter_by(user_id=user_id, artwork_id=artwork_id).delete(synchronize_session=False)
+                results[(user_id, artwork_id)] = bool(deleted)
+        
+        artwork_ids = {artwork_id for _, artwork_id in batch}
+        vote_total = (db.select(db.func.count(Vote.id))
+                      .where(Vote.artwork_id == Artwork.id)
+                      .scalar_subquery())
+        db.session.execute(db.update(Artwork).where(Artwork.id.in_(artwork_ids)).values(vote_count=vote_total))
+        bump_table_versions('artwork', 'vote')
+        db.session.commit()
+        
+        # One round of invalidation per batch instead of per vote
+        counts = dict(db.session.query(Artwork.id, Artwork.vote_count).filter(Artwork.id.in_(artwork_ids)))
+        for artwork_id, vote_count in counts.items():
+            leaderboard.set_votes(artwork_id, vote_count)
+            event_bus.publish('votes', vote_count, key=artwork_id)
+        event_bus.publish('statistics')
+        response_cache.invalidate('artworks', 'top-voted', 'statistics',
+                                  *(f'artwork:{artwork_id}' for artwork_id in artwork_ids))
+        return results
+
+vote_writer = VoteWriter()
+atexit.register(lambda: vote_writer.flush())  # whichever writer is current at exit
+
+def wants_durable_vote():
+    if 'durable' in request.args:
+        return arg_flag('durable')
+    return current_app.config['VOTE_DURABLE']
+
+def queue_vote(artwork_id, action):
+    """Write-behind counterpart of vote_artwork/remove_vote."""
+    user_id = session['user_id']
+    vote_count = leaderboard.get_votes(artwork_id)
+    if action == 'add':
+        if vote_count is None:
+            # Possibly approved through another worker since the leaderboard last synced
+            vote_count = (db.session.query(Artwork.vote_count)
+                          .filter(Artwork.id == artwork_id, Artwork.is_approved == True)
+                          .scalar())
+        if vote_count is None:
+            return jsonify({'error': 'Artwork not found'}), 404
+        if vote_writer.has_vote(user_id, artwork_id):
+            return jsonify({'error': 'You have already voted for this artwork'}), 409
+    elif not vote_writer.has_vote(user_id, artwork_id, confirm_absent=True):
+        return jsonify({'error': 'Vote not found'}), 404
+    
+    future = vote_writer.submit(user_id, artwork_id, action)
+    if wants_durable_vote():
+        try:
+            changed = future.result(timeout=10)
+        except FutureTimeoutError:
+            return jsonify({'error': 'Vote could not be saved in time, please retry'}), 503
+        if changed is None:
+            return jsonify({'error': 'Artwork not found'}), 404
+        if not changed and action == 'add':
+            return jsonify({'error': 'You have already voted for this artwork'}), 409
+        vote_count = get_artwork_counter(artwork_id, Artwork.vote_count)
+    elif vote_count is not None:
+        # Optimistic count; the flush publishes the committed one
+        vote_count = max(vote_count + (1 if action == 'add' else -1), 0)
+        leaderboard.set_votes(artwork_id, vote_count)
+    
+    return jsonify({
+        'message': 'Vote recorded successfully' if action == 'add' else 'Vote removed successfully',
+        'vote_count': vote_count or 0,
+        'queued': not wants_durable_vote()
+    })
+
+# Request Metrics
+SQL_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class RequestMetrics:
+    """Per-route request counters and histograms, rendered in Prometheus text format."""
+    
+    HISTOGRAMS = (
+        ('http_request_duration_seconds', 'Request latency by route.', 'seconds'),
+        ('http_request_sql_queries', 'SQL statements executed per request.', 'queries'),
+        ('http_response_size_bytes', 'Response body size (streamed responses excluded).', 'size'),
+    )
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}  # (route, method, status) -> count
+        self._sql_seconds = {}  # (route, method) -> total time in SQL
+        self._histograms = {}  # (route, method) -> {'seconds': Histogram, ...}
+    
+    def record(self, route, method, status, seconds, queries, sql_seconds, size):
+        key = (route, method)
+        with self._lock:
+            self._requests[key + (status,)] = self._requests.get(key + (status,), 0) + 1
+            self._sql_seconds[key] = self._sql_seconds.get(key, 0.0) + sql_seconds
+            histograms = self._histograms.get(key)
+            if histograms is None:
+                histograms = self._histograms[key] = {
+                    'seconds': Histogram(current_app.config['METRICS_LATENCY_BUCKETS']),
+                    'queries': Histogram(SQL_QUERY_BUCKETS),
+                    'size': Histogram(RESPONSE_SIZE_BUCKETS),
+                }
+            histograms['seconds'].observe(seconds)
+            histograms['queries'].observe(queries)
+            if size is not None:
+                histograms['size'].observe(size)
+    
+    def render(self):
+        def labels(route, method, **extra):
+            pairs = {'route': route, 'method': method, **extra}
+            return ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                            for name, value in pairs.items())
+        
+        with self._lock:
+            lines = ['# HELP http_requests_total Requests by route and status.',
+                     '# TYPE http_requests_total counter']
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{{labels(route, method, status=status)}}} {count}')
+            lines += ['# HELP http_request_sql_seconds_total Time spent in SQL by route.',
+                      '# TYPE http_request_sql_seconds_total counter']
+            for (route, method), total in sorted(self._sql_seconds.items()):
+                lines.append(f'http_request_sql_seconds_total{{{labels(route, method)}}} {total:.6f}')
+            for name, help_text, field in self.HISTOGRAMS:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (route, method), histograms in sorted(self._histograms.items()):
+                    histogram = histograms[field]
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels(route, method, le=bound)}}} {cumulative}')
+                    lines.append(f'{name}_sum{{{labels(route, method)}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels(route, method)}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+request_metrics = RequestMetrics()
+profile_lock = threading.Lock()  # cProfile allows one active profiler per process
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics' in g:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if started and has_request_context() and 'metrics' in g:
+        g.metrics['queries'] += 1
+        g.metrics['sql_seconds'] += time.perf_counter() - started.pop()
+
+@bp.before_app_request
+def start_request_metrics():
+    if not current_app.config['METRICS_ENABLED']:
+        return
+    g.metrics = {'started': time.perf_counter(), 'queries': 0, 'sql_seconds': 0.0}
+    if random.random() < current_app.config['PROFILE_SAMPLE_RATE'] and profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        try:
+            g.profiler.enable()
+        except ValueError:  # another profiling tool is active
+            g.pop('profiler')
+            profile_lock.release()
+
+@bp.after_app_request
+def record_request_metrics(response):
+    if 'metrics' not in g:
+        return response
+    seconds = time.perf_counter() - g.metrics['started']
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    size = None if response.is_streamed else response.calculate_content_length()
+    request_metrics.record(route, request.method, response.status_code, seconds,
+                           g.metrics['queries'], g.metrics['sql_seconds'], size)
+    finish_profile(seconds)
+    return response
+
+def finish_profile(seconds):
+    """Stop a sampled profiler, keeping the profile only for slow requests."""
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+        if seconds is not None and seconds >= current_app.config['PROFILE_SLOW_SECONDS']:
+            os.makedirs(current_app.config['PROFILE_DIR'], exist_ok=True)
+            path = os.path.join(current_app.config['PROFILE_DIR'],
+                                f"{datetime.utcnow():%Y%m%d-%H%M%S}-{request.endpoint}-{int(seconds * 1000)}ms.prof")
+            profiler.dump_stats(path)
+            current_app.logger.warning('Slow request %s %s took %.0f ms; profile saved to %s',
+                               request.method, request.path, seconds * 1000, path)
+    finally:
+        profile_lock.release()
+
+@bp.teardown_app_request
+def discard_profile(error=None):
+    # after_request is skipped when a request fails outright
+    finish_profile(None)
+
 # Authentication Routes
-@app.route('/api/auth/register', methods=['POST'])
+login_ip_limiter = TokenBucketLimiter('LOGIN_RATE_LIMIT_IP')
+login_user_limiter = TokenBucketLimiter('LOGIN_RATE_LIMIT_USER')
+
+@bp.route('/api/auth/register', methods=['POST'])
 def register():
     data = request.get_json()
     
@@ -126,6 +1648,10 @@ def register():
     if not data.get('username') or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Username, email, and password are required'}), 400
     
+    wait = login_ip_limiter.acquire(request.remote_addr)
+    if wait:
+        return rate_limited(wait)
+    
     # Check if user already exists
     if User.query.filter_by(username=data['username']).first():
         return jsonify({'error': 'Username already exists'}), 409
@@ -137,16 +1663,16 @@ def register():
     user = User(
         username=data['username'],
         email=data['email'],
-        password_hash=generate_password_hash(data['password'])
+        password_hash=hash_password(data['password'])
     )
     
     db.session.add(user)
+    bump_table_versions('user')
     db.session.commit()
+    response_cache.invalidate('statistics')
     
     # Auto-login after registration
-    session['user_id'] = user.id
-    session['username'] = user.username
-    session['is_admin'] = user.is_admin
+    start_session(user)
     
     return jsonify({
         'message': 'Registration successful',
@@ -158,19 +1684,26 @@ def register():
         }
     }), 201
 
-@app.route('/api/auth/login', methods=['POST'])
+@bp.route('/api/auth/login', methods=['POST'])
 def login():
     data = request.get_json()
     
     if not data.get('username') or not data.get('password'):
         return jsonify({'error': 'Username and password are required'}), 400
     
+    # Throttle before any hashing so a flood costs no CPU
+    wait = max(login_ip_limiter.acquire(request.remote_addr),
+               login_user_limiter.acquire(data['username'].lower()))
+    if wait:
+        return rate_limited(wait)
+    
     user = User.query.filter_by(username=data['username']).first()
     
-    if user and check_password_hash(user.password_hash, data['password']):
-        session['user_id'] = user.id
-        session['username'] = user.username
-        session['is_admin'] = user.is_admin
+    if user and verify_password(user.password_hash, data['password']):
+        if password_needs_rehash(user.password_hash):
+            user.password_hash = hash_password(data['password'])
+            db.session.commit()
+        start_session(user)
         
         return jsonify({
             'message': 'Login successful',
@@ -184,39 +1717,49 @@ def login():
     
     return jsonify({'error': 'Invalid username or password'}), 401
 
-@app.route('/api/auth/logout', methods=['POST'])
+@bp.route('/api/auth/logout', methods=['POST'])
 @login_required
 def logout():
     session.clear()
     return jsonify({'message': 'Logout successful'})
 
-@app.route('/api/auth/me', methods=['GET'])
+@bp.route('/api/auth/me', methods=['GET'])
 @login_required
 def get_current_user():
-    user = User.query.get(session['user_id'])
+    principal = current_principal()
+    if not principal:
+        session.clear()
+        return jsonify({'error': 'Authentication required'}), 401
+    
     return jsonify({
         'user': {
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'is_admin': user.is_admin
+            'id': principal.id,
+            'username': principal.username,
+            'email': principal.email,
+            'is_admin': principal.is_admin
         }
     })
 
 # Category Routes
-@app.route('/api/categories', methods=['GET'])
+@bp.route('/api/categories', methods=['GET'])
+@read_replica
+@conditional_response('category', 'artwork')
+@cached_response('categories')
 def get_categories():
-    categories = Category.query.all()
+    categories = (db.session.query(Category, db.func.count(Artwork.id))
+                  .outerjoin(Artwork, Artwork.category_id == Category.id)
+                  .group_by(Category.id)
+                  .all())
     return jsonify({
         'categories': [{
             'id': cat.id,
             'name': cat.name,
             'description': cat.description,
-            'artwork_count': len(cat.artworks)
-        } for cat in categories]
+            'artwork_count': artwork_count
+        } for cat, artwork_count in categories]
     })
 
-@app.route('/api/categories', methods=['POST'])
+@bp.route('/api/categories', methods=['POST'])
 @admin_required
 def create_category():
     data = request.get_json()
@@ -233,7 +1776,9 @@ def create_category():
     )
     
     db.session.add(category)
+    bump_table_versions('category')
     db.session.commit()
+    response_cache.invalidate('categories')
     
     return jsonify({
         'message': 'Category created successfully',
@@ -245,7 +1790,10 @@ def create_category():
     }), 201
 
 # Artwork Routes
-@app.route('/api/artworks', methods=['GET'])
+@bp.route('/api/artworks', methods=['GET'])
+@read_replica
+@conditional_response('artwork', 'user', 'category')
+@cached_response('artworks')
 def get_artworks():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 12, type=int)
@@ -253,7 +1801,7 @@ def get_artworks():
     featured_only = request.args.get('featured', type=bool)
     sort_by = request.args.get('sort', 'recent')  # recent, popular, title
     
-    query = Artwork.query.filter_by(is_approved=True)
+    query = artwork_query().filter_by(is_approved=True)
     
     if category_id:
         query = query.filter_by(category_id=category_id)
@@ -261,37 +1809,39 @@ def get_artworks():
     if featured_only:
         query = query.filter_by(is_featured=True)
     
-    # Sorting
+    # Cursor mode (opt-in via `cursor=1` or an `after` token)
+    if arg_flag('cursor') or request.args.get('after'):
+        items, pagination = cursor_paginate(query, sort_by, per_page)
+        if items is None:
+            return jsonify({'error': pagination}), 400
+        return jsonify({
+            'artworks': [serialize_artwork(artwork) for artwork in items],
+            'pagination': pagination
+        })
+    
     if sort_by == 'popular':
-        # Sort by vote count (requires a subquery)
-        query = query.outerjoin(Vote).group_by(Artwork.id).order_by(db.func.count(Vote.id).desc())
-    elif sort_by == 'title':
-        query = query.order_by(Artwork.title.asc())
-    else:  # recent
-        query = query.order_by(Artwork.created_at.desc())
+        # Coerce bad values the way paginate() does for the other orders
+        page = max(page, 1)
+        if per_page < 1:
+            per_page = 20
+        ids, total = leaderboard.page((page - 1) * per_page, per_page, category_id, featured_only)
+        pages = math.ceil(total / per_page)
+        return jsonify({
+            'artworks': [serialize_artwork(artwork) for artwork in load_artworks_in_order(ids)],
+            'pagination': {
+                'page': page,
+                'pages': pages,
+                'per_page': per_page,
+                'total': total,
+                'has_next': page < pages,
+                'has_prev': page > 1
+            }
+        })
     
-    artworks = query.paginate(page=page, per_page=per_page, error_out=False)
+    artworks = order_artworks(query, sort_by).paginate(page=page, per_page=per_page, error_out=False)
     
     return jsonify({
-        'artworks': [{
-            'id': artwork.id,
-            'title': artwork.title,
-            'description': artwork.description,
-            'filename': artwork.filename,
-            'file_path': f'/uploads/{artwork.filename}',
-            'artist': {
-                'id': artwork.artist.id,
-                'username': artwork.artist.username
-            },
-            'category': {
-                'id': artwork.category.id,
-                'name': artwork.category.name
-            } if artwork.category else None,
-            'vote_count': artwork.vote_count,
-            'comment_count': artwork.comment_count,
-            'is_featured': artwork.is_featured,
-            'created_at': artwork.created_at.isoformat()
-        } for artwork in artworks.items],
+        'artworks': [serialize_artwork(artwork) for artwork in artworks.items],
         'pagination': {
             'page': artworks.page,
             'pages': artworks.pages,
@@ -302,35 +1852,45 @@ def get_artworks():
         }
     })
 
-@app.route('/api/artworks/<int:artwork_id>', methods=['GET'])
+@bp.route('/api/artworks/search', methods=['GET'])
+@read_replica
+@conditional_response('artwork', 'user', 'category')
+@cached_response('artworks')
+def search_artworks():
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = max(min(request.args.get('per_page', 12, type=int), 100), 1)
+    terms = search_terms(request.args.get('q', ''))
+    
+    if not terms:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    ids = search_artwork_ids(terms, (page - 1) * per_page, per_page + 1)
+    artworks = [artwork for artwork in load_artworks_in_order(ids[:per_page]) if artwork.is_approved]
+    
+    return jsonify({
+        'artworks': [serialize_artwork(artwork) for artwork in artworks],
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'has_next': len(ids) > per_page,
+            'has_prev': page > 1
+        }
+    })
+
+@bp.route('/api/artworks/<int:artwork_id>', methods=['GET'])
+@read_replica
+@conditional_response('artwork', 'user', 'category')
+@cached_response('artwork:{artwork_id}')
 def get_artwork(artwork_id):
-    artwork = Artwork.query.filter_by(id=artwork_id, is_approved=True).first()
+    artwork = artwork_query().filter_by(id=artwork_id, is_approved=True).first()
     if not artwork:
         return jsonify({'error': 'Artwork not found'}), 404
     
     return jsonify({
-        'artwork': {
-            'id': artwork.id,
-            'title': artwork.title,
-            'description': artwork.description,
-            'filename': artwork.filename,
-            'file_path': f'/uploads/{artwork.filename}',
-            'artist': {
-                'id': artwork.artist.id,
-                'username': artwork.artist.username
-            },
-            'category': {
-                'id': artwork.category.id,
-                'name': artwork.category.name
-            } if artwork.category else None,
-            'vote_count': artwork.vote_count,
-            'comment_count': artwork.comment_count,
-            'is_featured': artwork.is_featured,
-            'created_at': artwork.created_at.isoformat()
-        }
+        'artwork': serialize_artwork(artwork)
     })
 
-@app.route('/api/artworks', methods=['POST'])
+@bp.route('/api/artworks', methods=['POST'])
 @login_required
 def upload_artwork():
     if 'file' not in request.files:
@@ -341,48 +1901,223 @@ def upload_artwork():
     description = request.form.get('description', '')
     category_id = request.form.get('category_id', type=int)
     
-    if not title:
-        return jsonify({'error': 'Title is required'}), 400
-    
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if not allowed_file(file.filename):
-        return jsonify({'error': 'Invalid file type'}), 400
-    
-    # Generate unique filename
-    original_filename = secure_filename(file.filename)
-    unique_filename = f"{uuid.uuid4().hex}_{original_filename}"
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-    
-    # Save file
-    file.save(file_path)
+    error = validate_artwork_upload(title, file.filename)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # Create artwork record
+    # Store content-addressed; validation and renditions happen on the upload workers
+    blob = store_upload(file.stream, file.filename.rsplit('.', 1)[1].lower())
+    return create_artwork(blob, file.filename, title, description, category_id)
+
+def create_artwork(blob, filename, title, description, category_id):
+    # Shared tail of the multipart and chunked upload paths
+    original_filename = secure_filename(filename)
     artwork = Artwork(
         title=title,
         description=description,
-        filename=unique_filename,
+        filename=blob.filename,
         original_filename=original_filename,
-        file_path=file_path,
+        file_path=os.path.join(current_app.config['UPLOAD_FOLDER'], storage_path(blob.filename)),
+        blob_sha256=blob.sha256,
         artist_id=session['user_id'],
         category_id=category_id,
+        processing_status='pending',
         is_approved=False  # Requires admin approval
     )
+    job = UploadJob(artwork=artwork)
     
     db.session.add(artwork)
+    db.session.add(job)
+    bump_table_versions('artwork')
     db.session.commit()
+    # Pending artworks only show up in the per-category totals
+    response_cache.invalidate('categories')
+    enqueue_upload_job(job.id)
+    event_bus.publish('artworks', 'submitted', key=artwork.id)
     
     return jsonify({
         'message': 'Artwork uploaded successfully and is pending approval',
         'artwork_id': artwork.id,
-        'file_url': f"/static/uploads/{unique_filename}"
-    }), 201
+        'file_url': f'/uploads/{blob.filename}',
+        'job': serialize_upload_job(job)
+    }), 202
+
+@bp.route('/api/uploads/<int:job_id>', methods=['GET'])
+@login_required
+def get_upload_job(job_id):
+    job = db.session.get(UploadJob, job_id)
+    if not job or (job.artwork.artist_id != session['user_id'] and not current_principal().is_admin):
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify({'job': serialize_upload_job(job)})
+
+# Chunked Upload Routes
+def chunked_upload_path(upload_id):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'incoming', f'{upload_id}.part')
+
+def get_chunked_upload(upload_id):
+    upload = db.session.get(ChunkedUpload, upload_id)
+    if upload is None or upload.user_id != session['user_id']:
+        return None
+    return upload
+
+def expire_chunked_uploads():
+    """Delete chunked uploads idle for CHUNKED_UPLOAD_EXPIRY_SECONDS and their partial files."""
+    expired_before = datetime.utcfromtimestamp(time.time() - current_app.config['CHUNKED_UPLOAD_EXPIRY_SECONDS'])
+    upload_ids = [upload_id for upload_id, in
+                  db.session.query(ChunkedUpload.id).filter(ChunkedUpload.updated_at < expired_before)]
+    expired = 0
+    for upload_id in upload_ids:
+        # Re-checked per row so a chunk that just arrived keeps its upload alive
+        if ChunkedUpload.query.filter(ChunkedUpload.id == upload_id, ChunkedUpload.updated_at < expired_before).delete(
+                synchronize_session=False):
+            db.session.commit()
+            expired += 1
+            try:
+                os.remove(chunked_upload_path(upload_id))
+            except FileNotFoundError:
+                pass
+    db.session.commit()
+    return expired
+
+def serialize_chunked_upload(upload):
+    return {
+        'upload_id': upload.id,
+        'size': upload.size,
+        'offset': upload.received,
+        'complete': upload.received == upload.size
+    }
+
+@bp.route('/api/uploads/chunked', methods=['POST'])
+@login_required
+def start_chunked_upload():
+    data = request.get_json()
+    filename = data.get('filename', '')
+    size = data.get('size')
+    sha256 = data.get('sha256') or ''
+    
+    if not all(isinstance(data.get(field, ''), str) for field in ('filename', 'title', 'sha256')):
+        return jsonify({'error': 'filename, title and sha256 must be strings'}), 400
+    description = data.get('description', '')
+    if description is not None and not isinstance(description, str):
+        return jsonify({'error': 'description must be a string'}), 400
+    category_id = data.get('category_id')
+    if category_id is not None and type(category_id) is not int:
+        return jsonify({'error': 'category_id must be an integer'}), 400
+    
+    error = validate_artwork_upload(data.get('title'), filename)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    if not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'File size is required'}), 400
+    
+    if size > current_app.config['CHUNKED_UPLOAD_MAX_SIZE']:
+        return jsonify({'error': 'File is too large'}), 413
+    
+    sha256 = sha256.lower()
+    if not re.fullmatch(r'[0-9a-f]{64}', sha256):
+        return jsonify({'error': 'A SHA-256 checksum of the file is required'}), 400
+    
+    expire_chunked_uploads()
+    if ChunkedUpload.query.filter_by(user_id=session['user_id']).count() >= current_app.config['CHUNKED_UPLOADS_PER_USER']:
+        return jsonify({'error': 'Too many uploads in progress; finish or wait for one to expire'}), 429
+    
+    upload = ChunkedUpload(
+        id=uuid.uuid4().hex,
+        user_id=session['user_id'],
+        filename=filename,
+        title=data['title'],
+        description=description,
+        category_id=category_id,
+        size=size,
+        sha256=sha256
+    )
+    path = chunked_upload_path(upload.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    
+    db.session.add(upload)
+    db.session.commit()
+    
+    return jsonify({'upload': serialize_chunked_upload(upload)}), 201
+
+@bp.route('/api/uploads/chunked/<upload_id>', methods=['GET'])
+@login_required
+def get_chunked_upload_status(upload_id):
+    upload = get_chunked_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify({'upload': serialize_chunked_upload(upload)})
+
+@bp.route('/api/uploads/chunked/<upload_id>', methods=['PUT'])
+@login_required
+def put_upload_chunk(upload_id):
+    upload = get_chunked_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    offset = request.args.get('offset', type=int)
+    if offset != upload.received:
+        # Tell the client where to resume from
+        return jsonify({'error': 'Offset does not match received bytes',
+                        'upload': serialize_chunked_upload(upload)}), 409
+    
+    # Copy the body in small pieces so memory stays bounded per request
+    written = 0
+    with open(chunked_upload_path(upload_id), 'r+b') as out:
+        out.seek(offset)
+        while True:
+            chunk = request.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            if offset + written + len(chunk) > upload.size:
+                return jsonify({'error': 'Chunk runs past the declared file size'}), 400
+            out.write(chunk)
+            written += len(chunk)
+    
+    # Conditional on the offset so concurrent retries of one chunk count once
+    ChunkedUpload.query.filter_by(id=upload_id, received=offset).update(
+        {ChunkedUpload.received: offset + written, ChunkedUpload.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.session.commit()
+    db.session.refresh(upload)
+    
+    return jsonify({'upload': serialize_chunked_upload(upload)})
+
+@bp.route('/api/uploads/chunked/<upload_id>/complete', methods=['POST'])
+@login_required
+def complete_chunked_upload(upload_id):
+    upload = get_chunked_upload(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    if upload.received != upload.size:
+        return jsonify({'error': 'Upload is incomplete',
+                        'upload': serialize_chunked_upload(upload)}), 409
+    
+    path = chunked_upload_path(upload_id)
+    with open(path, 'r+b') as f:
+        f.truncate(upload.size)
+    if file_sha256(path) != upload.sha256:
+        os.remove(path)
+        db.session.delete(upload)
+        db.session.commit()
+        return jsonify({'error': 'Checksum mismatch, please upload the file again'}), 422
+    
+    blob = add_blob_file(path, upload.sha256, upload.size, upload.filename.rsplit('.', 1)[1].lower())
+    db.session.delete(upload)
+    return create_artwork(blob, upload.filename, upload.title, upload.description, upload.category_id)
 
 # Voting Routes
-@app.route('/api/artworks/<int:artwork_id>/vote', methods=['POST'])
+@bp.route('/api/artworks/<int:artwork_id>/vote', methods=['POST'])
 @login_required
 def vote_artwork(artwork_id):
+    if current_app.config['VOTE_WRITE_BEHIND']:
+        return queue_vote(artwork_id, 'add')
+    
     artwork = Artwork.query.filter_by(id=artwork_id, is_approved=True).first()
     if not artwork:
         return jsonify({'error': 'Artwork not found'}), 404
@@ -395,58 +2130,232 @@ def vote_artwork(artwork_id):
     # Create vote
     vote = Vote(user_id=session['user_id'], artwork_id=artwork_id)
     db.session.add(vote)
+    adjust_artwork_counter(artwork_id, Artwork.vote_count, 1)
+    bump_table_versions('artwork', 'vote')
     db.session.commit()
     
+    vote_count = get_artwork_counter(artwork_id, Artwork.vote_count)
+    leaderboard.set_votes(artwork_id, vote_count)
+    event_bus.publish('votes', vote_count, key=artwork_id)
+    event_bus.publish('statistics')
+    response_cache.invalidate('artworks', f'artwork:{artwork_id}', 'top-voted', 'statistics')
     return jsonify({
         'message': 'Vote recorded successfully',
-        'vote_count': artwork.vote_count
+        'vote_count': vote_count
     })
 
-@app.route('/api/artworks/<int:artwork_id>/vote', methods=['DELETE'])
+@bp.route('/api/artworks/<int:artwork_id>/vote', methods=['DELETE'])
 @login_required
 def remove_vote(artwork_id):
+    if current_app.config['VOTE_WRITE_BEHIND']:
+        return queue_vote(artwork_id, 'remove')
+    
     vote = Vote.query.filter_by(user_id=session['user_id'], artwork_id=artwork_id).first()
     if not vote:
         return jsonify({'error': 'Vote not found'}), 404
     
     db.session.delete(vote)
+    adjust_artwork_counter(artwork_id, Artwork.vote_count, -1)
+    bump_table_versions('artwork', 'vote')
     db.session.commit()
     
-    artwork = Artwork.query.get(artwork_id)
+    vote_count = get_artwork_counter(artwork_id, Artwork.vote_count)
+    leaderboard.set_votes(artwork_id, vote_count)
+    event_bus.publish('votes', vote_count, key=artwork_id)
+    event_bus.publish('statistics')
+    response_cache.invalidate('artworks', f'artwork:{artwork_id}', 'top-voted', 'statistics')
     return jsonify({
         'message': 'Vote removed successfully',
-        'vote_count': artwork.vote_count if artwork else 0
+        'vote_count': vote_count
     })
 
-# Statistics Routes
-@app.route('/api/statistics', methods=['GET'])
-def get_statistics():
-    total_artworks = Artwork.query.filter_by(is_approved=True).count()
-    total_votes = Vote.query.count()
-    active_participants = User.query.count()
-    total_comments = Comment.query.count()
+# Comment Routes
+comment_limiter = TokenBucketLimiter('COMMENT_RATE_LIMIT')
+
+def serialize_comment(comment, reply_count=None):
+    data = {
+        'id': comment.id,
+        'content': comment.content,
+        'author': {
+            'id': comment.author.id,
+            'username': comment.author.username
+        },
+        'parent_id': comment.parent_id,
+        'created_at': comment.created_at.isoformat()
+    }
+    if reply_count is not None:
+        data['reply_count'] = reply_count
+    return data
+
+def comment_changed(artwork_id):
+    response_cache.invalidate('artworks', f'artwork:{artwork_id}', 'statistics')
+    event_bus.publish('statistics')
+
+@bp.route('/api/artworks/<int:artwork_id>/comments', methods=['GET'])
+def get_comments(artwork_id):
+    """Top-level comments oldest first, or the replies to `parent_id`, with cursor pagination."""
+    per_page = max(min(request.args.get('per_page', 20, type=int), 100), 1)
+    parent_id = request.args.get('parent_id', type=int)
+    
+    if not Artwork.query.filter_by(id=artwork_id, is_approved=True).count():
+        return jsonify({'error': 'Artwork not found'}), 404
+    
+    query = (Comment.query.options(db.joinedload(Comment.author))
+             .filter(Comment.artwork_id == artwork_id, Comment.parent_id == parent_id))
+    after = request.args.get('after')
+    if after:
+        decoded = decode_cursor('comments', after)
+        if decoded is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        created_at, last_id = decoded
+        query = query.filter(db.or_(Comment.created_at > created_at,
+                                    db.and_(Comment.created_at == created_at, Comment.id > last_id)))
+    rows = query.order_by(Comment.created_at.asc(), Comment.id.asc()).limit(per_page + 1).all()
+    comments = rows[:per_page]
+    has_next = len(rows) > per_page
+    
+    reply_counts = {}
+    if parent_id is None and comments:
+        # One grouped query for the whole page instead of one count per comment
+        reply_counts = dict(db.session.query(Comment.parent_id, db.func.count(Comment.id))
+                            .filter(Comment.parent_id.in_([comment.id for comment in comments]))
+                            .group_by(Comment.parent_id))
     
     return jsonify({
-        'statistics': {
-            'total_artworks': total_artworks,
-            'total_votes': total_votes,
-            'active_participants': active_participants,
-            'total_comments': total_comments
+        'comments': [serialize_comment(comment, reply_counts.get(comment.id, 0) if parent_id is None else None)
+                     for comment in comments],
+        'pagination': {
+            'per_page': per_page,
+            'has_next': has_next,
+            'next_cursor': encode_cursor('comments', comments[-1].created_at, comments[-1].id) if has_next else None
         }
     })
 
-@app.route('/api/top-voted', methods=['GET'])
+@bp.route('/api/artworks/<int:artwork_id>/comments', methods=['POST'])
+@login_required
+def create_comment(artwork_id):
+    data = request.get_json()
+    content = data.get('content') or ''
+    parent_id = data.get('parent_id')
+    
+    if not isinstance(content, str):
+        return jsonify({'error': 'content must be a string'}), 400
+    if parent_id is not None and type(parent_id) is not int:
+        return jsonify({'error': 'parent_id must be an integer'}), 400
+    
+    content = content.strip()
+    if not content:
+        return jsonify({'error': 'Comment content is required'}), 400
+    
+    if len(content) > current_app.config['COMMENT_MAX_LENGTH']:
+        return jsonify({'error': 'Comment is too long'}), 400
+    
+    wait = comment_limiter.acquire(session['user_id'])
+    if wait:
+        return rate_limited(wait)
+    
+    if not Artwork.query.filter_by(id=artwork_id, is_approved=True).count():
+        return jsonify({'error': 'Artwork not found'}), 404
+    
+    if parent_id is not None:
+        parent = Comment.query.filter_by(id=parent_id, artwork_id=artwork_id).first()
+        if not parent:
+            return jsonify({'error': 'Parent comment not found'}), 404
+        # Threads are one level deep: replies to replies join the same thread
+        parent_id = parent.parent_id or parent.id
+    
+    comment = Comment(content=content, user_id=session['user_id'], artwork_id=artwork_id, parent_id=parent_id)
+    db.session.add(comment)
+    adjust_artwork_counter(artwork_id, Artwork.comment_count, 1)
+    bump_table_versions('artwork', 'comment')
+    db.session.commit()
+    comment_changed(artwork_id)
+    
+    return jsonify({
+        'message': 'Comment added successfully',
+        'comment': serialize_comment(comment),
+        'comment_count': get_artwork_counter(artwork_id, Artwork.comment_count)
+    }), 201
+
+@bp.route('/api/comments/<int:comment_id>', methods=['DELETE'])
+@login_required
+def delete_comment(comment_id):
+    comment = db.session.get(Comment, comment_id)
+    if not comment:
+        return jsonify({'error': 'Comment not found'}), 404
+    
+    if comment.user_id != session['user_id'] and not current_principal().is_admin:
+        return jsonify({'error': 'You can only delete your own comments'}), 403
+    
+    artwork_id = comment.artwork_id
+    removed = Comment.query.filter_by(parent_id=comment.id).delete(synchronize_session=False)
+    db.session.delete(comment)
+    adjust_artwork_counter(artwork_id, Artwork.comment_count, -(removed + 1))
+    bump_table_versions('artwork', 'comment')
+    db.session.commit()
+    comment_changed(artwork_id)
+    
+    return jsonify({
+        'message': 'Comment deleted successfully',
+        'comment_count': get_artwork_counter(artwork_id, Artwork.comment_count)
+    })
+
+# Statistics Routes
+@bp.route('/api/statistics', methods=['GET'])
+@read_replica
+@conditional_response('artwork', 'vote', 'user', 'comment')
+@cached_response('statistics')
+def get_statistics():
+    return jsonify({
+        'statistics': compute_statistics()
+    })
+
+def compute_statistics():
+    return {
+        'total_artworks': Artwork.query.filter_by(is_approved=True).count(),
+        'total_votes': Vote.query.count(),
+        'active_participants': User.query.count(),
+        'total_comments': Comment.query.count()
+    }
+
+@bp.route('/api/stream', methods=['GET'])
+def event_stream():
+    """Server-Sent Events: `votes`, `statistics` and `artworks` updates.
+
+    Holds no request or database context while streaming; run under an
+    async-capable worker (e.g. gunicorn -k gevent) so idle clients are cheap.
+    """
+    subscriber = event_bus.subscribe()
+    keepalive = current_app.config['STREAM_KEEPALIVE_SECONDS']
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    message = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            event_bus.unsubscribe(subscriber)
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/top-voted', methods=['GET'])
+@read_replica
+@conditional_response('artwork', 'user')
+@cached_response('top-voted')
 def get_top_voted():
     limit = request.args.get('limit', 10, type=int)
     
-    # Query top voted artworks
-    top_artworks = (db.session.query(Artwork)
-                   .join(Vote)
-                   .filter(Artwork.is_approved == True)
-                   .group_by(Artwork.id)
-                   .order_by(db.func.count(Vote.id).desc())
-                   .limit(limit)
-                   .all())
+    top_artworks = load_artworks_in_order(leaderboard.top(limit))
     
     return jsonify({
         'top_voted': [{
@@ -459,37 +2368,38 @@ def get_top_voted():
     })
 
 # Admin Routes
-@app.route('/api/admin/artworks', methods=['GET'])
+@bp.route('/api/admin/artworks', methods=['GET'])
 @admin_required
 def admin_get_artworks():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     status = request.args.get('status')  # pending, approved, all
     
-    query = Artwork.query
+    query = artwork_query()
     
     if status == 'pending':
-        query = query.filter_by(is_approved=False)
+        query = query.filter_by(is_approved=False, is_rejected=False)
+    elif status == 'rejected':
+        query = query.filter_by(is_rejected=True)
     elif status == 'approved':
         query = query.filter_by(is_approved=True)
     
-    artworks = query.order_by(Artwork.created_at.desc()).paginate(
+    # Cursor mode (opt-in via `cursor=1` or an `after` token)
+    if arg_flag('cursor') or request.args.get('after'):
+        items, pagination = cursor_paginate(query, 'recent', per_page)
+        if items is None:
+            return jsonify({'error': pagination}), 400
+        return jsonify({
+            'artworks': [serialize_admin_artwork(artwork) for artwork in items],
+            'pagination': pagination
+        })
+    
+    artworks = order_artworks(query, 'recent').paginate(
         page=page, per_page=per_page, error_out=False
     )
     
     return jsonify({
-        'artworks': [{
-            'id': artwork.id,
-            'title': artwork.title,
-            'description': artwork.description,
-            'artist': artwork.artist.username,
-            'category': artwork.category.name if artwork.category else None,
-            'is_approved': artwork.is_approved,
-            'is_featured': artwork.is_featured,
-            'vote_count': artwork.vote_count,
-            'created_at': artwork.created_at.isoformat(),
-            'file_path': f'/uploads/{artwork.filename}'
-        } for artwork in artworks.items],
+        'artworks': [serialize_admin_artwork(artwork) for artwork in artworks.items],
         'pagination': {
             'page': artworks.page,
             'pages': artworks.pages,
@@ -498,29 +2408,404 @@ def admin_get_artworks():
         }
     })
 
-@app.route('/api/admin/artworks/<int:artwork_id>/approve', methods=['PUT'])
+@bp.route('/api/admin/cache', methods=['GET'])
+@admin_required
+def admin_cache_stats():
+    return jsonify({'cache': response_cache.stats()})
+
+@bp.route('/api/admin/metrics', methods=['GET'])
+@admin_required
+def admin_metrics():
+    if not current_app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'Metrics are disabled; set METRICS_ENABLED'}), 404
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/api/admin/users/<int:user_id>/role', methods=['PUT'])
+@admin_required
+def set_admin_role(user_id):
+    data = request.get_json()
+    if not isinstance(data.get('is_admin'), bool):
+        return jsonify({'error': 'is_admin must be true or false'}), 400
+    
+    if user_id == session['user_id'] and not data['is_admin']:
+        return jsonify({'error': 'You cannot revoke your own admin access'}), 400
+    
+    if not set_user_role(user_id, data['is_admin']):
+        return jsonify({'error': 'User not found'}), 404
+    
+    return jsonify({'message': 'Role updated successfully'})
+
+@bp.route('/api/admin/artworks/<int:artwork_id>/approve', methods=['PUT'])
 @admin_required
 def approve_artwork(artwork_id):
     artwork = Artwork.query.get_or_404(artwork_id)
+    # Until its upload job is done the file may still carry EXIF and has no renditions
+    if artwork.processing_status != 'ready':
+        return jsonify({'error': f'Artwork cannot be approved while processing is {artwork.processing_status}',
+                        'processing_status': artwork.processing_status}), 409
     artwork.is_approved = True
+    artwork.is_rejected = False
+    index_artwork(artwork)
+    bump_table_versions('artwork')
     db.session.commit()
+    leaderboard.put(artwork)
+    event_bus.publish('artworks', 'approved', key=artwork_id)
+    event_bus.publish('statistics')
+    response_cache.invalidate('artworks', f'artwork:{artwork_id}', 'statistics')
+    if artwork.vote_count:
+        response_cache.invalidate('top-voted')
     
     return jsonify({'message': 'Artwork approved successfully'})
 
-@app.route('/api/admin/artworks/<int:artwork_id>/feature', methods=['PUT'])
+@bp.route('/api/admin/artworks/<int:artwork_id>/feature', methods=['PUT'])
 @admin_required
 def toggle_featured(artwork_id):
     artwork = Artwork.query.get_or_404(artwork_id)
     artwork.is_featured = not artwork.is_featured
+    bump_table_versions('artwork')
     db.session.commit()
+    leaderboard.put(artwork)
+    response_cache.invalidate('artworks', f'artwork:{artwork_id}')
     
     status = 'featured' if artwork.is_featured else 'unfeatured'
     return jsonify({'message': f'Artwork {status} successfully'})
 
+# Target state per bulk action; rows already in that state are left untouched
+BULK_ACTIONS = {
+    'approve': {'is_approved': True, 'is_rejected': False},
+    'reject': {'is_approved': False, 'is_rejected': True, 'is_featured': False},
+    'feature': {'is_featured': True},
+    'unfeature': {'is_featured': False},
+}
+
+def bulk_target_ids(data):
+    """The artwork ids named by a bulk request: an explicit `ids` list or a `filter`."""
+    limit = current_app.config['BULK_MODERATION_MAX']
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+            return None, 'ids must be a list of integers'
+        if len(ids) > limit:
+            return None, f'At most {limit} artworks per request'
+        return list(dict.fromkeys(ids)), None
+    
+    criteria = data.get('filter')
+    if not isinstance(criteria, dict):
+        return None, 'Either ids or filter is required'
+    query = db.session.query(Artwork.id)
+    status = criteria.get('status')
+    if status == 'pending':
+        query = query.filter_by(is_approved=False, is_rejected=False)
+    elif status == 'rejected':
+        query = query.filter_by(is_rejected=True)
+    elif status == 'approved':
+        query = query.filter_by(is_approved=True)
+    if criteria.get('category_id') is not None:
+        query = query.filter_by(category_id=criteria['category_id'])
+    if criteria.get('artist_id') is not None:
+        query = query.filter_by(artist_id=criteria['artist_id'])
+    requested = data.get('limit')
+    if requested is not None:
+        if type(requested) is not int or requested < 1:
+            return None, 'limit must be a positive integer'
+        limit = min(requested, limit)
+    ids = query.order_by(Artwork.created_at.asc(), Artwork.id.asc()).limit(limit)
+    return [row.id for row in ids], None
+
+@bp.route('/api/admin/artworks/bulk', methods=['POST'])
+@admin_required
+def bulk_moderate_artworks():
+    """Apply one moderation action to many artworks, one UPDATE and commit per chunk."""
+    data = request.get_json()
+    action = data.get('action')
+    if action not in BULK_ACTIONS:
+        return jsonify({'error': f"action must be one of: {', '.join(BULK_ACTIONS)}"}), 400
+    
+    ids, error = bulk_target_ids(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    target = BULK_ACTIONS[action]
+    already = db.and_(*(getattr(Artwork, column) == value for column, value in target.items()))
+    # Only uploads whose processing finished may be published (see approve_artwork)
+    ready = Artwork.processing_status == 'ready' if action == 'approve' else db.true()
+    results = dict.fromkeys(ids, 'not_found')
+    changed = []
+    chunk_size = current_app.config['BULK_MODERATION_CHUNK']
+    
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        pending = []
+        for artwork_id, done, is_ready in db.session.query(Artwork.id, already, ready).filter(Artwork.id.in_(chunk)):
+            if done:
+                results[artwork_id] = 'unchanged'
+            elif not is_ready:
+                results[artwork_id] = 'not_ready'
+            else:
+                pending.append(artwork_id)
+        if pending:
+            Artwork.query.filter(Artwork.id.in_(pending)).update(
+                {**target, 'updated_at': datetime.utcnow()}, synchronize_session=False
+            )
+            if 'is_approved' in target:
+                index_artworks(pending)
+            bump_table_versions('artwork')
+        db.session.commit()
+        results.update((artwork_id, 'updated') for artwork_id in pending)
+        changed.extend(pending)
+    
+    # Invalidate once for the whole batch rather than once per row
+    if changed:
+        leaderboard.invalidate()
+        response_cache.invalidate_all()
+        if action == 'approve':
+            for artwork_id in changed:
+                event_bus.publish('artworks', 'approved', key=artwork_id)
+        if 'is_approved' in target:
+            event_bus.publish('statistics')
+    
+    counts = {outcome: 0 for outcome in ('updated', 'unchanged', 'not_ready', 'not_found')}
+    for outcome in results.values():
+        counts[outcome] += 1
+    return jsonify({'action': action, **counts, 'results': results})
+
 # Initialize database
-def create_tables():
+# Schema migrations. create_all() only creates missing tables, so every change
+# to an existing table is a migration here. Each one must be idempotent: a
+# fresh database already has the change from create_all() and only gets it
+# recorded as applied.
+def add_column(table, name, ddl):
+    if name in {col['name'] for col in db.inspect(db.engine).get_columns(table)}:
+        return False
+    table = db.engine.dialect.identifier_preparer.quote(table)  # "user" is reserved on PostgreSQL
+    db.session.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {name} {ddl}'))
+    return True
+
+def create_indexes(*models):
+    for model in models:
+        for index in model.__table__.indexes:
+            index.create(db.session.connection(), checkfirst=True)
+
+def migrate_artwork_counters():
+    added = add_column('artwork', 'vote_count', 'INTEGER NOT NULL DEFAULT 0')
+    added = add_column('artwork', 'comment_count', 'INTEGER NOT NULL DEFAULT 0') or added
+    if added:
+        db.session.commit()
+        recount_artworks()
+
+def migrate_artwork_renditions():
+    add_column('artwork', 'renditions', 'JSON')
+
+def migrate_artwork_processing_status():
+    add_column('artwork', 'processing_status', "VARCHAR(20) NOT NULL DEFAULT 'ready'")
+
+def migrate_artwork_blob():
+    add_column('artwork', 'blob_sha256', 'VARCHAR(64) REFERENCES blob (sha256)')
+
+def migrate_hot_path_indexes():
+    create_indexes(Artwork, Vote, UploadJob)
+
+def migrate_comment_threads():
+    add_column('comment', 'parent_id', 'INTEGER REFERENCES comment (id)')
+    db.session.commit()
+    create_indexes(Comment)
+
+def migrate_user_auth_version():
+    add_column('user', 'auth_version', 'INTEGER NOT NULL DEFAULT 1')
+
+def migrate_artwork_rejected():
+    add_column('artwork', 'is_rejected', 'BOOLEAN NOT NULL DEFAULT FALSE')
+
+def migrate_chunked_upload_indexes():
+    create_indexes(ChunkedUpload)
+
+def migrate_artwork_blob_index():
+    create_indexes(Artwork)
+
+def migrate_user_password_hash_length():
+    # SQLite does not enforce VARCHAR lengths
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(db.text('ALTER TABLE "user" ALTER COLUMN password_hash TYPE VARCHAR(255)'))
+
+def migrate_artwork_search():
+    global search_index_available
+    if db.engine.dialect.name != 'sqlite':
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(db.text(SEARCH_TABLE_DDL))
+    except OperationalError:
+        current_app.logger.warning('SQLite was built without FTS5; search falls back to LIKE')
+        return
+    search_index_available = True
+    rebuild_search_index()
+
+MIGRATIONS = [
+    ('0001_artwork_counters', migrate_artwork_counters),
+    ('0002_artwork_renditions', migrate_artwork_renditions),
+    ('0003_artwork_processing_status', migrate_artwork_processing_status),
+    ('0004_artwork_blob', migrate_artwork_blob),
+    ('0005_hot_path_indexes', migrate_hot_path_indexes),
+    ('0006_artwork_search', migrate_artwork_search),
+    ('0007_comment_threads', migrate_comment_threads),
+    ('0008_user_auth_version', migrate_user_auth_version),
+    ('0009_artwork_rejected', migrate_artwork_rejected),
+    ('0010_user_password_hash_length', migrate_user_password_hash_length),
+    ('0011_chunked_upload_indexes', migrate_chunked_upload_indexes),
+    ('0012_artwork_blob_index', migrate_artwork_blob_index),
+]
+
+def create_table_versions():
+    # bump_table_versions only UPDATEs, so every versioned table needs its row
+    for name in VERSIONED_TABLES:
+        if not db.session.get(TableVersion, name):
+            db.session.add(TableVersion(name=name, version=0))
+    db.session.commit()
+
+def migrate():
+    """Create missing tables, apply pending migrations in order and add missing
+    version counters; returns the ids of the migrations applied.
+    """
     db.create_all()
-    
+    done = {migration_id for migration_id, in db.session.query(SchemaMigration.id)}
+    applied = []
+    for migration_id, migration in MIGRATIONS:
+        if migration_id in done:
+            continue
+        migration()
+        db.session.add(SchemaMigration(id=migration_id))
+        db.session.commit()
+        applied.append(migration_id)
+    create_table_versions()
+    return applied
+
+@bp.cli.command('migrate')
+def migrate_command():
+    """Bring the database schema up to date."""
+    applied = migrate()
+    print(f"Applied {len(applied)} migrations{': ' + ', '.join(applied) if applied else ''}")
+
+def query_plan_checks():
+    """The hot read queries, built the same way the endpoints build them.
+
+    Maps name -> (query, whether walking a whole index in order is fine,
+    which it is only for unfiltered ORDER BY ... LIMIT pages).
+    """
+    approved = artwork_query().filter_by(is_approved=True)
+    return {
+        'artworks recent': (order_artworks(approved, 'recent').limit(12), False),
+        'artworks title': (order_artworks(approved, 'title').limit(12), False),
+        'artworks popular': (order_artworks(approved, 'popular').limit(12), False),
+        'artworks category': (order_artworks(approved.filter_by(category_id=1), 'recent').limit(12), False),
+        'artworks featured': (order_artworks(approved.filter_by(is_featured=True), 'recent').limit(12), False),
+        'admin all': (order_artworks(artwork_query(), 'recent').limit(20), True),
+        'admin pending': (order_artworks(artwork_query().filter_by(is_approved=False, is_rejected=False), 'recent')
+                          .limit(20), False),
+        'leaderboard': (db.session.query(Artwork.id, Artwork.vote_count).filter(Artwork.is_approved == True), False),
+        'vote count': (db.session.query(db.func.count(Vote.id)).filter(Vote.artwork_id == 1), False),
+        'comments page': (Comment.query.filter(Comment.artwork_id == 1, Comment.parent_id == None)
+                          .order_by(Comment.created_at.asc(), Comment.id.asc()).limit(20), False),
+    }
+
+def find_plan_regressions():
+    """EXPLAIN the hot queries; return {name: plan} for any that scan or sort a whole table."""
+    dialect = db.engine.dialect
+    regressions = {}
+    for name, (query, ordered_scan_ok) in query_plan_checks().items():
+        sql = str(query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+        if dialect.name == 'sqlite':
+            plan = [row[-1] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+            bad = [line for line in plan
+                   if 'TEMP B-TREE' in line
+                   or (re.match(r'SCAN (artwork|vote)\b', line)
+                       and not (ordered_scan_ok and ' USING INDEX ' in line))]
+        else:
+            plan = [row[0] for row in db.session.execute(db.text(f'EXPLAIN {sql}'))]
+            bad = [line for line in plan if re.search(r'Seq Scan on (artwork|vote)\b', line)]
+        if bad:
+            regressions[name] = plan
+    return regressions
+
+@bp.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if a hot listing query stops using its index."""
+    regressions = find_plan_regressions()
+    for name, plan in regressions.items():
+        print(f'{name}:')
+        for line in plan:
+            print(f'    {line}')
+    if regressions:
+        raise SystemExit(f'{len(regressions)} queries regressed to full scans')
+    print('All query plans use indexes')
+
+def recount_artworks():
+    vote_total = (db.select(db.func.count(Vote.id))
+                  .where(Vote.artwork_id == Artwork.id)
+                  .scalar_subquery())
+    comment_total = (db.select(db.func.count(Comment.id))
+                     .where(Comment.artwork_id == Artwork.id)
+                     .scalar_subquery())
+    result = db.session.execute(
+        db.update(Artwork).values(vote_count=vote_total, comment_count=comment_total)
+    )
+    bump_table_versions('artwork')
+    db.session.commit()
+    leaderboard.invalidate()
+    response_cache.invalidate_all()
+    return result.rowcount
+
+@bp.cli.command('recount-artworks')
+def recount_artworks_command():
+    """Rebuild Artwork.vote_count/comment_count from the Vote and Comment tables."""
+    updated = recount_artworks()
+    print(f'Recounted {updated} artworks')
+
+@bp.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Repopulate the full-text index from approved artworks."""
+    if not has_search_index():
+        raise SystemExit('No full-text index in this database')
+    rebuild_search_index()
+    db.session.commit()
+    print('Search index rebuilt')
+
+@bp.cli.command('process-uploads')
+def process_uploads_command():
+    """Run every queued upload job to completion."""
+    queued = resume_upload_jobs()
+    get_upload_executor().shutdown(wait=True)
+    print(f'Processed {queued} upload jobs')
+
+@bp.cli.command('expire-chunked-uploads')
+def expire_chunked_uploads_command():
+    """Delete abandoned chunked uploads and their partial files."""
+    expired = expire_chunked_uploads()
+    print(f'Expired {expired} chunked uploads')
+
+@bp.cli.command('backfill-renditions')
+def backfill_renditions_command():
+    """Create renditions for artworks uploaded before they existed."""
+    queued = backfill_renditions()
+    resume_upload_jobs()
+    get_upload_executor().shutdown(wait=True)
+    print(f'Processed {queued} artworks without renditions')
+
+@bp.cli.command('set-admin')
+@click.argument('username')
+@click.option('--revoke', is_flag=True, help='Remove admin access instead of granting it.')
+def set_admin_command(username, revoke):
+    """Grant (or revoke) admin access for a user."""
+    user = User.query.filter_by(username=username).first()
+    if not user:
+        raise SystemExit(f'No user named {username}')
+    set_user_role(user.id, not revoke)
+    print(f"{username} is {'no longer' if revoke else 'now'} an admin")
+
+def init_database():
+    """Apply migrations and create the version counters; safe to run repeatedly."""
+    migrate()
+
+def seed_categories():
     # Create default categories if they don't exist
     default_categories = [
         {'name': 'Paintings', 'description': 'Traditional and digital paintings'},
@@ -537,26 +2822,149 @@ def create_tables():
     
     db.session.commit()
 
+def create_tables():
+    init_database()
+    seed_categories()
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Create the schema and apply migrations (run once per deploy)."""
+    init_database()
+    print('Database is up to date')
+
+@bp.cli.command('seed')
+@click.option('--admin', 'admin_username', help='Also create this admin account (password is prompted).')
+@click.option('--email', help='Email for the admin account.')
+def seed_command(admin_username, email):
+    """Add the default categories and, optionally, a first admin."""
+    seed_categories()
+    bump_table_versions('category')
+    if admin_username:
+        if User.query.filter_by(username=admin_username).first():
+            raise SystemExit(f'User {admin_username} already exists')
+        password = click.prompt('Password', hide_input=True, confirmation_prompt=True)
+        user = User(username=admin_username, email=email or f'{admin_username}@localhost',
+                    password_hash=hash_password(password), is_admin=True)
+        db.session.add(user)
+        bump_table_versions('user')
+    db.session.commit()
+    print('Seeded default categories' + (f' and admin {admin_username}' if admin_username else ''))
+
 # Error handlers
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Resource not found'}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(PasswordHashingBusy)
+def password_hashing_busy(error):
+    response = jsonify({'error': 'Server is busy, please try again shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+@bp.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     return jsonify({'error': 'Internal server error'}), 500
-@app.route('/')
+
+@bp.route('/')
 def index():
     return render_template('index.html')
 
 
-@app.route('/uploads/<path:filename>')
+@bp.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Only public names are served, never blobs/ or in-progress incoming/ paths
+    if '/' in filename:
+        return jsonify({'error': 'Resource not found'}), 404
+    match = BLOB_FILENAME.match(filename)
+    if match and not is_published_blob(match.group(1)):
+        return jsonify({'error': 'Resource not found'}), 404
+    
+    # `?size=thumb|medium` picks a rendition, preferring WebP when accepted
+    size = request.args.get('size')
+    served = storage_path(filename)
+    rendition_missing = False
+    if size in current_app.config['RENDITION_SIZES']:
+        extensions = ['jpg', 'png']
+        if request.accept_mimetypes['image/webp']:
+            extensions.insert(0, 'webp')
+        for ext in extensions:
+            candidate = storage_path(rendition_filename(filename, size, ext))
+            path = safe_join(current_app.config['UPLOAD_FOLDER'], candidate)
+            if path and os.path.isfile(path):
+                served = candidate
+                break
+        else:
+            rendition_missing = True
+    
+    # A stand-in original must not be pinned under the rendition URL once one exists
+    max_age = current_app.config['RENDITION_FALLBACK_MAX_AGE' if rendition_missing else 'UPLOAD_MAX_AGE']
+    response = send_from_directory(current_app.config['UPLOAD_FOLDER'], served, max_age=max_age)
+    response.cache_control.public = True
+    response.cache_control.immutable = not rendition_missing
+    if size:
+        response.vary.add('Accept')
+    return response
+
+# Application Factory
+created_apps = weakref.WeakSet()
+
+def reset_after_fork():
+    """Drop state a forked worker must not share with its parent."""
+    global upload_executor, password_pool, upload_jobs_resumed, event_bus, vote_writer
+    upload_executor = None
+    password_pool = None
+    upload_jobs_resumed = False
+    event_bus = EventBus()
+    vote_writer = VoteWriter()
+    for app in list(created_apps):
+        # Pooled connections belong to the parent; each worker opens its own on first use
+        with app.app_context():
+            for engine in db.engines.values():
+                if not is_memory_sqlite(engine.url):
+                    engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
+def create_app(config=None):
+    """Build the app: defaults, then DATABASE_URL/FESTIVAL_* environment variables, then `config`.
+
+    Caches, pools and the leaderboard live at module level, so they are
+    shared by every app created in the same process.
+    """
+    global password_slots
+    # Ensure Flask serves the local `static` and `templates` directories inside this project
+    app = Flask(__name__, static_folder='static', template_folder='templates')
+    configure_defaults(app)
+    configure_database(app.config)
+    app.config.from_prefixed_env('FESTIVAL')  # e.g. FESTIVAL_SECRET_KEY, FESTIVAL_VOTE_WRITE_BEHIND=true
+    app.config.update(config or {})
+    configure_engine_options(app.config)
+    
+    db.init_app(app)
+    CORS(app, supports_credentials=True)
+    app.register_blueprint(bp)
+    
+    response_cache.backend.max_entries = app.config['RESPONSE_CACHE_SIZE']
+    principal_cache.max_entries = app.config['PRINCIPAL_CACHE_SIZE']
+    password_slots = threading.BoundedSemaphore(app.config['PASSWORD_HASH_QUEUE'])
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    
+    if app.config['AUTO_MIGRATE']:
+        with app.app_context():
+            init_database()
+            db.session.remove()
+            for engine in db.engines.values():
+                # Disposing the only connection to an in-memory database drops it
+                if not is_memory_sqlite(engine.url):
+                    engine.dispose()
+    created_apps.add(app)
+    return app
 
 
 if __name__ == '__main__':
+    app = create_app()
     # Create DB and default categories on first run (inside app context)
     with app.app_context():
         create_tables()
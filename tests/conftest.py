@@ -0,0 +1,128 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import learn
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a fresh SQLite file, with the per-process caches reset."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    # Module-level state outlives an app; give each test its own
+    monkeypatch.setattr(learn, 'leaderboard', learn.Leaderboard())
+    monkeypatch.setattr(learn, 'response_cache', learn.ResponseCache(learn.LRUCacheBackend()))
+    monkeypatch.setattr(learn, 'principal_cache', learn.LRUCacheBackend())
+    monkeypatch.setattr(learn, 'event_bus', learn.EventBus())
+    monkeypatch.setattr(learn, 'vote_writer', learn.VoteWriter())
+    monkeypatch.setattr(learn, 'upload_executor', None)
+    monkeypatch.setattr(learn, 'search_index_available', None)
+    for name in ('login_ip_limiter', 'login_user_limiter', 'comment_limiter'):
+        monkeypatch.setattr(learn, name, learn.TokenBucketLimiter(getattr(learn, name).config_key))
+
+    app = learn.create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'PASSWORD_HASH_WORKERS': 0,
+        'RESUME_UPLOAD_JOBS': False,
+    })
+    with app.app_context():
+        learn.create_tables()
+    yield app
+    with app.app_context():
+        learn.db.session.remove()
+        for engine in learn.db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username, is_admin=False):
+        with app.app_context():
+            user = learn.User(username=username, email=f'{username}@example.com',
+                              password_hash='unused', is_admin=is_admin)
+            learn.db.session.add(user)
+            learn.db.session.commit()
+            return user.id
+    return make_user
+
+
+@pytest.fixture
+def login(app):
+    def login(client, user_id):
+        with app.app_context():
+            user = learn.db.session.get(learn.User, user_id)
+            with client.session_transaction() as session:
+                session['user_id'] = user.id
+                session['username'] = user.username
+                session['is_admin'] = user.is_admin
+                session['auth_version'] = user.auth_version
+        return client
+    return login
+
+
+@pytest.fixture
+def admin_client(app, client, make_user, login):
+    return login(client, make_user('admin', is_admin=True))
+
+
+@pytest.fixture
+def seed_artworks(app, make_user):
+    """Insert `approved` + `pending` artworks spread over a few artists and categories."""
+    def seed_artworks(approved, pending=0):
+        artist_ids = [make_user(f'artist{i}') for i in range(3)]
+        now = datetime.utcnow()
+        with app.app_context():
+            category_ids = [category.id for category in learn.Category.query.all()]
+            for i in range(approved + pending):
+                learn.db.session.add(learn.Artwork(
+                    title=f'Artwork {i}', description='', filename=f'a{i}.png', file_path=f'a{i}.png',
+                    artist_id=artist_ids[i % len(artist_ids)], category_id=category_ids[i % len(category_ids)],
+                    is_approved=i < approved, is_featured=i % 7 == 0, vote_count=i % 5,
+                    created_at=now - timedelta(minutes=i),
+                ))
+            learn.bump_table_versions('artwork')
+            learn.db.session.commit()
+    return seed_artworks
+
+
+@pytest.fixture
+def query_counter(app):
+    """Counts the SQL statements issued while the `with` block runs."""
+    class QueryCounter:
+        def __init__(self):
+            self.count = 0
+            self.active = False
+
+        def __enter__(self):
+            self.count = 0
+            self.active = True
+            return self
+
+        def __exit__(self, *exc):
+            self.active = False
+
+    counter = QueryCounter()
+
+    def count_query(*args):
+        if counter.active:
+            counter.count += 1
+
+    with app.app_context():
+        engine = learn.db.engine
+    event.listen(engine, 'before_cursor_execute', count_query)
+    yield counter
+    event.remove(engine, 'before_cursor_execute', count_query)
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import learn
+
+
+def test_create_app_does_not_register_fork_hooks(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(os, 'register_at_fork', lambda **kwargs: calls.append(kwargs))
+    learn.create_app({'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    assert calls == []
+    assert app in learn.created_apps
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_drops_inherited_connections(app, client):
+    other = learn.create_app({'SQLALCHEMY_DATABASE_URI': app.config['SQLALCHEMY_DATABASE_URI']})
+    assert client.get('/api/categories').status_code == 200
+    assert other.test_client().get('/api/categories').status_code == 200
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            pooled = 0
+            for each in (app, other):
+                with each.app_context():
+                    pooled += sum(engine.pool.checkedin() for engine in learn.db.engines.values())
+            os._exit(0 if pooled == 0 else 1)
+        except BaseException:
+            os._exit(2)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_create_app_accepts_in_memory_sqlite(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    monkeypatch.delenv('DATABASE_READ_URL', raising=False)
+    app = learn.create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'AUTO_MIGRATE': True,
+    })
+    assert 'pool_size' not in app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    with app.app_context():
+        assert learn.db.session.query(learn.Category).count() >= 0
+        learn.db.session.remove()
+
+
+def test_pool_sizing_applies_to_file_databases(app):
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    assert options['pool_size'] == 10
+    assert options['pool_pre_ping'] is True
+
+
+def test_password_hash_column_fits_scrypt_hashes(app):
+    with app.app_context():
+        assert learn.User.__table__.c.password_hash.type.length >= len(learn.hash_password('x' * 64))
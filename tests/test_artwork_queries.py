@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/artworks',
+    '/api/artworks?sort=title',
+    '/api/artworks?sort=popular',
+    '/api/artworks?cursor=1',
+    '/api/admin/artworks',
+    '/api/admin/artworks?status=pending',
+    '/api/admin/artworks?cursor=1',
+])
+def test_listing_query_count_does_not_grow_with_page_size(app, admin_client, seed_artworks, query_counter, url):
+    seed_artworks(approved=40, pending=30)
+    separator = '&' if '?' in url else '?'
+    admin_client.get(f'{url}{separator}per_page=1')  # warm the principal cache and leaderboard
+
+    counts = {}
+    for per_page in (5, 25):
+        with query_counter:
+            response = admin_client.get(f'{url}{separator}per_page={per_page}')
+        assert response.status_code == 200
+        assert len(response.get_json()['artworks']) == per_page
+        counts[per_page] = query_counter.count
+
+    assert counts[5] == counts[25]
@@ -0,0 +1,98 @@
+import time
+
+import learn
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_event_bus_flusher_delivers_events(app):
+    app.config['STREAM_BATCH_SECONDS'] = 0.01
+    with app.test_request_context():
+        subscriber = learn.event_bus.subscribe()
+    try:
+        learn.event_bus.publish('votes', 3, key=1)
+        message = subscriber.get(timeout=3)
+        assert message.startswith('event: votes\n')
+        assert learn.event_bus._flusher.is_alive()
+    finally:
+        learn.event_bus.unsubscribe(subscriber)
+
+
+def test_vote_writer_flushes_queued_votes(app, client, make_user, login, seed_artworks):
+    app.config.update(VOTE_WRITE_BEHIND=True, VOTE_FLUSH_SECONDS=0.01, VOTE_BLOOM_CAPACITY=1000)
+    seed_artworks(approved=3)
+    login(client, make_user('voter'))
+
+    response = client.post('/api/artworks/1/vote')
+    assert response.status_code == 200
+    assert response.get_json()['queued'] is True
+
+    def stored_votes():
+        learn.db.session.rollback()  # start a fresh snapshot on every poll
+        return learn.db.session.query(learn.Vote).filter_by(artwork_id=1).count()
+
+    with app.app_context():
+        assert wait_for(lambda: stored_votes() == 1)
+    assert learn.vote_writer._flusher.is_alive()
+
+
+def test_vote_writer_removes_vote_cast_through_another_worker(app, client, make_user, login, seed_artworks):
+    app.config.update(VOTE_WRITE_BEHIND=True, VOTE_FLUSH_SECONDS=0.01, VOTE_BLOOM_CAPACITY=1000)
+    seed_artworks(approved=3)
+    user_id = make_user('voter')
+    login(client, user_id)
+
+    with app.test_request_context():
+        assert not learn.vote_writer.has_vote(user_id, 1)
+    assert wait_for(lambda: learn.vote_writer._bloom is not None)
+
+    # Committed after this worker loaded its filter
+    with app.app_context():
+        learn.db.session.add(learn.Vote(user_id=user_id, artwork_id=1))
+        learn.db.session.commit()
+
+    response = client.delete('/api/artworks/1/vote?durable=1')
+    assert response.status_code == 200
+    with app.app_context():
+        assert learn.Vote.query.filter_by(user_id=user_id, artwork_id=1).count() == 0
+
+
+def set_approved(app, artwork_id, approved):
+    # As another worker would: straight to the database, not this worker's leaderboard
+    with app.app_context():
+        learn.db.session.get(learn.Artwork, artwork_id).is_approved = approved
+        learn.db.session.commit()
+
+
+def test_queued_vote_accepts_artwork_approved_by_another_worker(app, client, make_user, login, seed_artworks):
+    app.config.update(VOTE_WRITE_BEHIND=True, VOTE_FLUSH_SECONDS=0.01, VOTE_BLOOM_CAPACITY=1000)
+    seed_artworks(approved=2, pending=1)
+    login(client, make_user('voter'))
+    assert client.post('/api/artworks/3/vote').status_code == 404  # loads the leaderboard
+
+    set_approved(app, 3, True)
+    response = client.post('/api/artworks/3/vote?durable=1')
+    assert response.status_code == 200
+    with app.app_context():
+        assert learn.Vote.query.filter_by(artwork_id=3).count() == 1
+
+
+def test_queued_vote_on_artwork_rejected_by_another_worker_is_skipped(app, client, make_user, login, seed_artworks):
+    app.config.update(VOTE_WRITE_BEHIND=True, VOTE_FLUSH_SECONDS=0.01, VOTE_BLOOM_CAPACITY=1000)
+    seed_artworks(approved=2)
+    login(client, make_user('voter'))
+    with app.test_request_context():
+        assert learn.leaderboard.get_votes(1) is not None
+
+    set_approved(app, 1, False)
+    response = client.post('/api/artworks/1/vote?durable=1')
+    assert response.status_code == 404
+    with app.app_context():
+        assert learn.Vote.query.filter_by(artwork_id=1).count() == 0
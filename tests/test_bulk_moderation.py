@@ -0,0 +1,62 @@
+import pytest
+
+import learn
+
+
+@pytest.mark.parametrize('limit', ['5', 2.5, True, 0, -1])
+def test_bulk_filter_rejects_invalid_limit(admin_client, seed_artworks, limit):
+    seed_artworks(approved=0, pending=3)
+    response = admin_client.post('/api/admin/artworks/bulk', json={
+        'action': 'approve', 'filter': {'status': 'pending'}, 'limit': limit
+    })
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'limit must be a positive integer'
+
+
+def test_bulk_filter_honours_limit(app, admin_client, seed_artworks):
+    seed_artworks(approved=0, pending=3)
+    response = admin_client.post('/api/admin/artworks/bulk', json={
+        'action': 'approve', 'filter': {'status': 'pending'}, 'limit': 2
+    })
+    assert response.status_code == 200
+    with app.app_context():
+        assert learn.Artwork.query.filter_by(is_approved=True).count() == 2
+
+
+def set_processing_status(app, statuses):
+    with app.app_context():
+        for artwork_id, status in statuses.items():
+            learn.db.session.get(learn.Artwork, artwork_id).processing_status = status
+        learn.db.session.commit()
+
+
+@pytest.mark.parametrize('status', ['pending', 'failed'])
+def test_unprocessed_artwork_cannot_be_approved(app, admin_client, seed_artworks, status):
+    seed_artworks(approved=0, pending=1)
+    set_processing_status(app, {1: status})
+    response = admin_client.put('/api/admin/artworks/1/approve')
+    assert response.status_code == 409
+    assert response.get_json()['processing_status'] == status
+    with app.app_context():
+        assert not learn.db.session.get(learn.Artwork, 1).is_approved
+
+
+def test_bulk_approve_reports_unprocessed_artworks(app, admin_client, seed_artworks):
+    seed_artworks(approved=0, pending=3)
+    set_processing_status(app, {2: 'pending', 3: 'failed'})
+    body = admin_client.post('/api/admin/artworks/bulk', json={'action': 'approve', 'ids': [1, 2, 3]}).get_json()
+    assert body['results'] == {'1': 'updated', '2': 'not_ready', '3': 'not_ready'}
+    assert (body['updated'], body['not_ready']) == (1, 2)
+
+    # Other actions do not depend on processing
+    body = admin_client.post('/api/admin/artworks/bulk', json={'action': 'feature', 'ids': [2]}).get_json()
+    assert body['results'] == {'2': 'updated'}
+
+
+@pytest.mark.parametrize('ids', [[True], [1, False], ['1'], [1.0]])
+def test_bulk_ids_must_be_integers(app, admin_client, seed_artworks, ids):
+    seed_artworks(approved=0, pending=2)
+    response = admin_client.post('/api/admin/artworks/bulk', json={'action': 'approve', 'ids': ids})
+    assert response.status_code == 400
+    with app.app_context():
+        assert learn.Artwork.query.filter_by(is_approved=True).count() == 0
@@ -0,0 +1,61 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import learn
+
+SHA256 = 'a' * 64
+
+
+@pytest.fixture
+def uploader(client, make_user, login):
+    return login(client, make_user('uploader'))
+
+
+def start(client, **overrides):
+    data = {'filename': 'art.png', 'title': 'Art', 'size': 10, 'sha256': SHA256, **overrides}
+    return client.post('/api/uploads/chunked', json=data)
+
+
+@pytest.mark.parametrize('overrides', [
+    {'filename': 5},
+    {'title': ['Art']},
+    {'sha256': 7},
+    {'description': {}},
+    {'category_id': '1'},
+])
+def test_start_rejects_wrong_field_types(uploader, overrides):
+    assert start(uploader, **overrides).status_code == 400
+
+
+def test_open_uploads_per_user_are_capped(app, uploader):
+    app.config['CHUNKED_UPLOADS_PER_USER'] = 2
+    assert start(uploader).status_code == 201
+    assert start(uploader).status_code == 201
+    assert start(uploader).status_code == 429
+
+
+def test_idle_uploads_expire_with_their_files(app, uploader):
+    app.config['CHUNKED_UPLOADS_PER_USER'] = 1
+    upload_id = start(uploader).get_json()['upload']['upload_id']
+    with app.test_request_context():
+        path = learn.chunked_upload_path(upload_id)
+        assert os.path.exists(path)
+        upload = learn.db.session.get(learn.ChunkedUpload, upload_id)
+        upload.updated_at = datetime.utcnow() - timedelta(seconds=app.config['CHUNKED_UPLOAD_EXPIRY_SECONDS'] + 1)
+        learn.db.session.commit()
+
+    # Starting a new upload sweeps the abandoned one, freeing the slot
+    assert start(uploader).status_code == 201
+    with app.app_context():
+        assert learn.db.session.get(learn.ChunkedUpload, upload_id) is None
+    assert not os.path.exists(path)
+
+
+def test_expire_command_keeps_active_uploads(app, uploader):
+    start(uploader)
+    result = app.test_cli_runner().invoke(args=['expire-chunked-uploads'])
+    assert 'Expired 0 chunked uploads' in result.output
+    with app.app_context():
+        assert learn.ChunkedUpload.query.count() == 1
@@ -0,0 +1,81 @@
+import pytest
+
+import learn
+
+
+@pytest.fixture
+def commenter(app, client, make_user, login, seed_artworks):
+    app.config['COMMENT_RATE_LIMIT'] = (100, 60)
+    seed_artworks(approved=1)
+    return login(client, make_user('commenter'))
+
+
+def post(client, content, parent_id=None):
+    response = client.post('/api/artworks/1/comments', json={'content': content, 'parent_id': parent_id})
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def comment_count(app):
+    with app.app_context():
+        return learn.db.session.get(learn.Artwork, 1).comment_count
+
+
+@pytest.mark.parametrize('body', [
+    {'content': 5},
+    {'content': ['hello']},
+    {'content': 'hello', 'parent_id': '1'},
+    {'content': 'hello', 'parent_id': True},
+])
+def test_wrong_field_types_are_rejected(commenter, body):
+    response = commenter.post('/api/artworks/1/comments', json=body)
+    assert response.status_code == 400
+
+
+def test_replies_to_replies_join_the_top_level_thread(commenter):
+    top = post(commenter, 'top')['comment']
+    reply = post(commenter, 'reply', top['id'])['comment']
+    nested = post(commenter, 'nested', reply['id'])['comment']
+    assert reply['parent_id'] == top['id']
+    assert nested['parent_id'] == top['id']
+
+    replies = commenter.get(f"/api/artworks/1/comments?parent_id={top['id']}").get_json()['comments']
+    assert [comment['content'] for comment in replies] == ['reply', 'nested']
+
+
+def test_top_level_pages_follow_the_cursor_with_reply_counts(commenter):
+    ids = [post(commenter, f'comment {i}')['comment']['id'] for i in range(5)]
+    post(commenter, 'reply', ids[0])
+    post(commenter, 'reply', ids[0])
+
+    seen, reply_counts, url = [], {}, '/api/artworks/1/comments?per_page=2'
+    while url:
+        body = commenter.get(url).get_json()
+        for comment in body['comments']:
+            seen.append(comment['id'])
+            reply_counts[comment['id']] = comment['reply_count']
+        cursor = body['pagination']['next_cursor']
+        url = f'/api/artworks/1/comments?per_page=2&after={cursor}' if cursor else None
+    assert seen == ids
+    assert reply_counts == {ids[0]: 2, **{comment_id: 0 for comment_id in ids[1:]}}
+
+
+def test_deleting_a_comment_removes_its_replies_from_the_count(app, commenter):
+    top = post(commenter, 'top')['comment']
+    post(commenter, 'reply', top['id'])
+    post(commenter, 'reply', top['id'])
+    other = post(commenter, 'other')
+    assert other['comment_count'] == comment_count(app) == 4
+
+    response = commenter.delete(f"/api/comments/{top['id']}")
+    assert response.status_code == 200
+    assert response.get_json()['comment_count'] == comment_count(app) == 1
+
+
+def test_comments_are_rate_limited_per_user(app, commenter):
+    app.config['COMMENT_RATE_LIMIT'] = (2, 60)
+    post(commenter, 'one')
+    post(commenter, 'two')
+    response = commenter.post('/api/artworks/1/comments', json={'content': 'three'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
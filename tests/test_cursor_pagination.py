@@ -0,0 +1,44 @@
+import base64
+import json
+
+import pytest
+
+
+def token(*parts):
+    return base64.urlsafe_b64encode(json.dumps(list(parts)).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('per_page', [0, -3])
+def test_cursor_mode_clamps_per_page(client, seed_artworks, per_page):
+    seed_artworks(3)
+    response = client.get(f'/api/artworks?cursor=1&per_page={per_page}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['artworks']) == 1
+    assert body['pagination']['next_cursor']
+
+
+def test_cursor_walks_every_artwork(client, seed_artworks):
+    seed_artworks(5)
+    seen, url = [], '/api/artworks?cursor=1&per_page=2&sort=popular'
+    while url:
+        body = client.get(url).get_json()
+        seen += [artwork['id'] for artwork in body['artworks']]
+        cursor = body['pagination']['next_cursor']
+        url = f'/api/artworks?per_page=2&sort=popular&after={cursor}' if cursor else None
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.parametrize('sort, key', [
+    ('recent', 5),
+    ('recent', 'not a date'),
+    ('popular', '3'),
+    ('popular', True),
+    ('title', 7),
+    ('title', None),
+])
+def test_cursor_with_wrong_key_type_is_rejected(client, seed_artworks, sort, key):
+    seed_artworks(3)
+    response = client.get(f'/api/artworks?sort={sort}&after={token(sort, key, 1)}')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid cursor'
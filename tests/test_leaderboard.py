@@ -0,0 +1,44 @@
+import pytest
+
+import learn
+
+
+def expected_page(category_id, featured_only, offset, limit):
+    query = learn.Artwork.query.filter_by(is_approved=True)
+    if category_id:
+        query = query.filter_by(category_id=category_id)
+    if featured_only:
+        query = query.filter_by(is_featured=True)
+    ids = [artwork.id for artwork in learn.order_artworks(query, 'popular')]
+    return ids[offset:offset + limit], len(ids)
+
+
+@pytest.mark.parametrize('category_id, featured_only', [(None, False), (1, False), (None, True), (2, True)])
+def test_filtered_pages_match_sql_order(app, seed_artworks, category_id, featured_only):
+    seed_artworks(30)
+    with app.app_context():
+        artwork = learn.db.session.get(learn.Artwork, 2)
+        artwork.is_featured = True
+        artwork.vote_count = 50
+        learn.db.session.commit()
+        learn.leaderboard.page(0, 1)  # load before the changes below
+        learn.leaderboard.put(artwork)
+        learn.leaderboard.set_votes(8, 40)
+        learn.db.session.get(learn.Artwork, 8).vote_count = 40
+        learn.db.session.commit()
+
+        for offset in (0, 5):
+            assert learn.leaderboard.page(offset, 5, category_id, featured_only) == \
+                expected_page(category_id, featured_only, offset, 5)
+
+
+@pytest.mark.parametrize('sort', ['popular', 'recent'])
+@pytest.mark.parametrize('query', ['per_page=-5', 'per_page=0', 'page=-2&per_page=5'])
+def test_popular_page_coerces_bad_page_args_like_other_orders(client, seed_artworks, sort, query):
+    seed_artworks(30)
+    body = client.get(f'/api/artworks?sort={sort}&{query}').get_json()
+    pagination = body['pagination']
+    reference = client.get(f'/api/artworks?sort=title&{query}').get_json()['pagination']
+    assert pagination == reference
+    assert pagination['per_page'] >= 1 and pagination['page'] == 1
+    assert len(body['artworks']) == pagination['per_page']
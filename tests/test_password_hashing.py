@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+import learn
+from test_background_threads import wait_for
+
+
+def slot_free():
+    if not learn.password_slots.acquire(blocking=False):
+        return False
+    learn.password_slots.release()
+    return True
+
+
+@pytest.fixture
+def hashing_pool(app, monkeypatch):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_TIMEOUT=30)
+    monkeypatch.setattr(learn, 'password_slots', threading.BoundedSemaphore(1))
+    yield
+    with app.app_context():
+        learn.get_password_pool().shutdown(wait=True, cancel_futures=True)
+    learn.password_pool = None
+
+
+def test_timed_out_hash_keeps_its_slot_until_the_worker_finishes(app, hashing_pool):
+    with app.app_context():
+        assert learn.run_password_hashing(abs, -1) == 1  # start the worker process
+
+        app.config['PASSWORD_HASH_TIMEOUT'] = 0.05
+        with pytest.raises(learn.PasswordHashingBusy):
+            learn.run_password_hashing(time.sleep, 1)
+        # The worker is still busy, so a new request must not be queued behind it
+        assert not slot_free()
+        with pytest.raises(learn.PasswordHashingBusy):
+            learn.run_password_hashing(abs, -2)
+
+        assert wait_for(slot_free, timeout=5)
+        app.config['PASSWORD_HASH_TIMEOUT'] = 30
+        assert learn.run_password_hashing(abs, -3) == 3
+
+
+def test_submit_failure_releases_the_slot(app, hashing_pool):
+    with app.app_context():
+        learn.get_password_pool().shutdown(wait=True)
+        with pytest.raises(learn.PasswordHashingBusy):
+            learn.run_password_hashing(abs, -1)
+        assert slot_free()
+        assert learn.run_password_hashing(abs, -4) == 4
@@ -0,0 +1,61 @@
+import re
+
+import pytest
+from sqlalchemy import event
+
+import learn
+
+
+@pytest.fixture
+def admins(app, make_user, login):
+    """Two logged-in admin clients: (acting admin, admin who gets demoted, demoted admin's id)."""
+    acting = login(app.test_client(), make_user('head', is_admin=True))
+    target_id = make_user('deputy', is_admin=True)
+    target = login(app.test_client(), target_id)
+    return acting, target, target_id
+
+
+@pytest.fixture
+def user_queries(app):
+    """SQL statements reading the user table while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if re.search(r'FROM "?user"?\b', statement):
+            statements.append(statement)
+
+    with app.app_context():
+        engine = learn.db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_demotion_through_the_api_applies_to_the_next_request(admins):
+    acting, target, target_id = admins
+    assert target.get('/api/admin/artworks').status_code == 200  # caches the principal
+
+    response = acting.put(f'/api/admin/users/{target_id}/role', json={'is_admin': False})
+    assert response.status_code == 200
+    assert target.get('/api/admin/artworks').status_code == 403
+
+
+def test_demotion_through_set_user_role_applies_to_the_next_request(app, admins):
+    _, target, target_id = admins
+    assert target.get('/api/admin/artworks').status_code == 200
+
+    with app.app_context():
+        assert learn.set_user_role(target_id, False)
+    assert target.get('/api/admin/artworks').status_code == 403
+
+
+def test_cached_principal_is_used_within_the_ttl(app, admins, user_queries):
+    _, target, _ = admins
+    app.config['PRINCIPAL_CACHE_TTL'] = 60
+    assert target.get('/api/admin/artworks').status_code == 200
+    assert len(user_queries) == 1
+
+    user_queries.clear()
+    for _ in range(3):
+        assert target.get('/api/admin/artworks').status_code == 200
+    assert user_queries == []
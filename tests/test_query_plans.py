@@ -0,0 +1,15 @@
+import learn
+
+
+def test_hot_queries_use_their_indexes(app, seed_artworks):
+    seed_artworks(approved=40, pending=10)
+    with app.app_context():
+        learn.db.session.execute(learn.db.text('ANALYZE'))
+        assert learn.find_plan_regressions() == {}
+
+
+def test_dropped_index_is_reported(app, seed_artworks):
+    seed_artworks(approved=40)
+    with app.app_context():
+        learn.db.session.execute(learn.db.text('DROP INDEX ix_artwork_approved_votes'))
+        assert 'artworks popular' in learn.find_plan_regressions()
@@ -0,0 +1,31 @@
+import learn
+
+
+def test_cached_body_is_not_served_under_a_newer_etag(app, client, seed_artworks):
+    seed_artworks(3)
+    first = client.get('/api/artworks')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert client.get('/api/artworks').headers['X-Cache'] == 'HIT'
+
+    # Another worker committed a change; this worker's cache was not invalidated
+    with app.app_context():
+        learn.bump_table_versions('artwork')
+        learn.db.session.commit()
+
+    second = client.get('/api/artworks')
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.headers['X-Cache'] == 'MISS'
+
+
+def test_migrate_alone_creates_the_version_counters(app, admin_client):
+    with app.app_context():
+        learn.TableVersion.query.delete()
+        learn.db.session.commit()
+        learn.migrate()
+        assert {row.name for row in learn.TableVersion.query} == set(learn.VERSIONED_TABLES)
+
+    etag = admin_client.get('/api/categories').headers['ETag']
+    assert admin_client.post('/api/categories', json={'name': 'Ceramics'}).status_code == 201
+    response = admin_client.get('/api/categories', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'Ceramics' in response.get_data(as_text=True)
@@ -0,0 +1,88 @@
+import pytest
+
+import learn
+
+
+@pytest.fixture
+def catalogue(app, make_user):
+    """Approved artworks with known text, indexed for search; returns {title: id}."""
+    artist_id = make_user('painter')
+    rows = [
+        ('Harbour at dawn', 'Boats'),
+        ('Still life', 'A harbour seen from a window'),
+        ('Portrait', 'Study in oil'),
+        ('Harbour lights', 'Night scene'),
+        ('Hidden garden', 'Hedges'),
+    ]
+    with app.app_context():
+        ids = {}
+        for title, description in rows:
+            artwork = learn.Artwork(title=title, description=description, filename='a.png', file_path='a.png',
+                                    artist_id=artist_id, is_approved=True)
+            learn.db.session.add(artwork)
+            learn.db.session.flush()
+            ids[title] = artwork.id
+        if learn.has_search_index():
+            learn.rebuild_search_index()
+        learn.bump_table_versions('artwork')
+        learn.db.session.commit()
+    return ids
+
+
+def search(client, query):
+    response = client.get(f'/api/artworks/search?{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def titles(body):
+    return [artwork['title'] for artwork in body['artworks']]
+
+
+def test_index_is_available(app):
+    with app.app_context():
+        assert learn.has_search_index()
+
+
+def test_title_matches_rank_above_description_matches(client, catalogue):
+    found = titles(search(client, 'q=harbour'))
+    assert sorted(found[:2]) == ['Harbour at dawn', 'Harbour lights']
+    assert found[2:] == ['Still life']
+
+
+def test_terms_match_as_prefixes(client, catalogue):
+    assert titles(search(client, 'q=harb+dawn')) == ['Harbour at dawn']
+    assert sorted(titles(search(client, 'q=hi'))) == ['Hidden garden']
+    # Single characters only match whole words
+    assert titles(search(client, 'q=h')) == []
+
+
+@pytest.mark.parametrize('per_page', [-5, 0, 1])
+def test_per_page_is_clamped(client, catalogue, per_page):
+    body = search(client, f'q=harbour&per_page={per_page}')
+    assert len(body['artworks']) == 1
+    assert body['pagination']['per_page'] == 1
+    assert body['pagination']['has_next'] is True
+
+
+def test_pages_cover_every_match_once(client, catalogue):
+    seen, page = [], 1
+    while True:
+        body = search(client, f'q=harbour&per_page=2&page={page}')
+        seen += titles(body)
+        if not body['pagination']['has_next']:
+            break
+        page += 1
+    assert sorted(seen) == ['Harbour at dawn', 'Harbour lights', 'Still life']
+
+
+def test_ranking_is_bounded_to_the_newest_candidates(app, client, catalogue):
+    app.config['SEARCH_RANK_CANDIDATES'] = 2
+    body = search(client, 'q=harbour')
+    assert sorted(titles(body)) == ['Harbour lights', 'Still life']
+    assert body['pagination']['has_next'] is False
+
+
+def test_like_fallback_without_the_index(client, catalogue, monkeypatch):
+    monkeypatch.setattr(learn, 'search_index_available', False)
+    assert sorted(titles(search(client, 'q=harb'))) == ['Harbour at dawn', 'Harbour lights', 'Still life']
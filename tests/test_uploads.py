@@ -0,0 +1,102 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import learn
+
+
+def test_add_blob_file_reuses_row_inserted_by_concurrent_upload(app, monkeypatch):
+    data = b'same bytes'
+    sha256 = hashlib.sha256(data).hexdigest()
+    with app.test_request_context():
+        learn.db.session.add(learn.Blob(sha256=sha256, filename=f'{sha256}.png', size=len(data)))
+        learn.db.session.commit()
+        learn.db.session.expunge_all()
+
+        # The other upload commits between our lookup and our insert
+        real_get = learn.db.session.get
+        lookups = []
+        def racing_get(model, key):
+            lookups.append(key)
+            return None if len(lookups) == 1 else real_get(model, key)
+        monkeypatch.setattr(learn.db.session, 'get', racing_get)
+
+        tmp_path = os.path.join(app.config['UPLOAD_FOLDER'], 'upload.part')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        blob = learn.add_blob_file(tmp_path, sha256, len(data), 'jpg')
+        learn.db.session.commit()
+
+        assert blob.filename == f'{sha256}.png'
+        assert not os.path.exists(tmp_path)
+        assert learn.Blob.query.count() == 1
+
+
+def exif_jpeg():
+    Image = pytest.importorskip('PIL.Image')
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    out = io.BytesIO()
+    Image.new('RGB', (64, 48), 'red').save(out, format='JPEG', exif=exif.tobytes())
+    return out.getvalue()
+
+
+def test_exif_is_stripped_into_a_new_blob(app, client, make_user, login, monkeypatch):
+    queued = []
+    monkeypatch.setattr(learn, 'enqueue_upload_job', queued.append)
+    login(client, make_user('artist'))
+    data = exif_jpeg()
+    raw_sha256 = hashlib.sha256(data).hexdigest()
+
+    response = client.post('/api/artworks', data={'title': 'Red', 'file': (io.BytesIO(data), 'red.jpg')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 202
+    raw_url = response.get_json()['file_url']
+    assert client.get(raw_url).status_code == 404  # not public before processing
+
+    learn.run_upload_job(app, queued[0])
+    with app.app_context():
+        artwork = learn.db.session.get(learn.Artwork, response.get_json()['artwork_id'])
+        assert artwork.processing_status == 'ready'
+        assert artwork.blob_sha256 != raw_sha256
+        assert learn.file_sha256(artwork.file_path) == artwork.blob_sha256
+        assert learn.db.session.get(learn.Blob, artwork.blob_sha256).size == os.path.getsize(artwork.file_path)
+        raw_path = os.path.join(app.config['UPLOAD_FOLDER'], learn.storage_path(f'{raw_sha256}.jpg'))
+        assert learn.file_sha256(raw_path) == raw_sha256  # the original blob is untouched
+        filename = artwork.filename
+
+    assert client.get(raw_url).status_code == 404
+    served = client.get(f'/uploads/{filename}')
+    assert served.status_code == 200
+    assert b'Camera maker' not in served.get_data()
+
+
+def test_missing_rendition_is_not_cached_as_immutable(app, client, make_user):
+    Image = pytest.importorskip('PIL.Image')
+    artist_id = make_user('legacy')
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'legacy.png')
+    Image.new('RGB', (1600, 1200), 'blue').save(path)
+    with app.app_context():
+        # Uploaded before renditions existed
+        learn.db.session.add(learn.Artwork(title='Old', filename='legacy.png', file_path=path,
+                                           artist_id=artist_id, is_approved=True))
+        learn.db.session.commit()
+
+    fallback = client.get('/uploads/legacy.png?size=thumb')
+    assert fallback.status_code == 200
+    assert not fallback.cache_control.immutable
+    assert fallback.cache_control.max_age == app.config['RENDITION_FALLBACK_MAX_AGE']
+    assert client.get('/uploads/legacy.png').cache_control.immutable
+
+    result = app.test_cli_runner().invoke(args=['backfill-renditions'])
+    assert 'Processed 1 artworks without renditions' in result.output
+    with app.app_context():
+        assert set(learn.Artwork.query.one().renditions) >= {'thumb', 'medium'}
+        assert learn.backfill_renditions() == 0
+
+    thumb = client.get('/uploads/legacy.png?size=thumb')
+    assert thumb.cache_control.immutable
+    assert thumb.cache_control.max_age == app.config['UPLOAD_MAX_AGE']
+    assert len(thumb.get_data()) < len(fallback.get_data())
@@ -0,0 +1,11 @@
+"""Production entry point.
+
+    flask --app learn init-db && flask --app learn seed   # once per deploy
+    gunicorn --preload --workers 4 wsgi:app
+
+With --preload the app is built once in the master and forked; each worker
+then opens its own database connections and background threads lazily.
+"""
+from learn import create_app
+
+app = create_app()